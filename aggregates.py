@@ -0,0 +1,244 @@
+# aggregates.py
+"""
+Running study statistics, updated whenever a survey is saved, so showing them never
+rescans data/:
+
+- participants (devices with a survey) and surveys saved
+- per Big Five item: count / mean / variance of the 1–7 answers (Welford)
+- participants per language
+- histograms of video_q1 / video_q2 (1–5)
+
+A participant counts once, with their latest survey: a new survey from the same
+device takes back the earlier one's contribution (Welford in reverse) and adds its
+own; saving the same answers again only counts as another save.
+
+Kept in data/aggregates.json, read-modify-written under the data folder's lock and
+replaced atomically. store_surveys() reads a device's previous survey and stores the
+new one under that device's SAVE_LOCK, so concurrent saves of one device fold in
+turn while other devices save in parallel. current() only stats the file unless
+another process changed it. The file is derived data: if it is missing it is built
+once from data/.
+
+    python aggregates.py             # print the aggregates
+    python aggregates.py --rebuild   # recompute from data/ (after editing files by hand)
+"""
+
+import os
+import sys
+import json
+import math
+import argparse
+import itertools
+import threading
+from typing import Optional, List, Dict, Any, Tuple, Callable
+
+import records
+import storage
+
+AGGREGATES_FILE = "aggregates.json"
+SAVE_LOCK = ".survey.lock"   # data/<DEVICE_ID>/: one survey save at a time (the appends take .lock)
+VERSION = 1
+VIDEO_FIELDS = ("video_q1", "video_q2")
+VIDEO_SCALE = ("1", "2", "3", "4", "5")
+# the guidance page shows cohort means instead of the fixed norms from this many participants on
+COHORT_MIN = int(os.environ.get("MENTALYTICS_COHORT_MIN", "5"))
+
+_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}   # path -> ((mtime_ns, size), aggregates)
+_cache_lock = threading.Lock()
+
+
+def _path() -> str:
+    return os.path.join(storage.DATA_DIR, AGGREGATES_FILE)
+
+def empty() -> Dict[str, Any]:
+    return {
+        "version": VERSION, "participants": 0, "surveys": 0, "langs": {},
+        "big5": {k: {"n": 0, "mean": 0.0, "m2": 0.0} for k in records.BIG5_KEYS},
+        **{f: {v: 0 for v in VIDEO_SCALE} for f in VIDEO_FIELDS},
+    }
+
+
+# -----------------
+#  WELFORD
+# -----------------
+def _add(s: Dict[str, float], x: float):
+    s["n"] += 1
+    d = x - s["mean"]
+    s["mean"] += d / s["n"]
+    s["m2"] += d * (x - s["mean"])
+
+def _remove(s: Dict[str, float], x: float):
+    if s["n"] <= 1:
+        s.update(n=0, mean=0.0, m2=0.0)
+        return
+    d = x - s["mean"]
+    s["mean"] -= d / (s["n"] - 1)
+    s["m2"] = max(0.0, s["m2"] - d * (x - s["mean"]))
+    s["n"] -= 1
+
+def stats(s: Dict[str, float]) -> Dict[str, Optional[float]]:
+    """n / mean / sd (sample) of one running statistic; None where undefined."""
+    n = s["n"]
+    return {"n": n, "mean": s["mean"] if n else None,
+            "sd": math.sqrt(s["m2"] / (n - 1)) if n > 1 else None}
+
+
+# -----------------
+#  CONTRIBUTIONS
+# -----------------
+def _contribution(rec: Dict[str, Any]) -> Dict[str, Any]:
+    """What one stored survey adds: its language, Big Five as 1–7, video answers."""
+    big5 = rec.get("big5") or {}
+    video = {}
+    for f in VIDEO_FIELDS:
+        v = str(rec.get(f, "")).strip()
+        if v in VIDEO_SCALE:
+            video[f] = v
+    return {
+        "lang": rec.get("lang") or "",
+        "big5": {k: n for k in records.BIG5_KEYS if (n := records.likert_num(big5.get(k))) is not None},
+        "video": video,
+    }
+
+def _apply(agg: Dict[str, Any], rec: Dict[str, Any], sign: int):
+    c = _contribution(rec)
+    langs = agg["langs"]
+    langs[c["lang"]] = langs.get(c["lang"], 0) + sign
+    if not langs[c["lang"]]:
+        del langs[c["lang"]]
+    for k, x in c["big5"].items():
+        (_add if sign > 0 else _remove)(agg["big5"][k], x)
+    for f, v in c["video"].items():
+        agg[f][v] += sign
+
+def _fold(agg: Dict[str, Any], rec: Dict[str, Any], previous: Optional[Dict[str, Any]]):
+    """The device's survey `rec` replaces `previous` (its latest one before, or None)."""
+    agg["surveys"] += 1
+    if previous is None:
+        agg["participants"] += 1
+    elif storage.content_hash(previous) == storage.content_hash(rec):
+        return   # same answers again
+    else:
+        _apply(agg, previous, -1)
+    _apply(agg, rec, +1)
+
+
+# -----------------
+#  PERSISTENCE
+# -----------------
+def _load(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            agg = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return agg if agg.get("version") == VERSION else None
+
+def _save(path: str, agg: Dict[str, Any]):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(agg, f, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp, path)
+
+def rebuild(data_dir: str = "") -> Dict[str, Any]:
+    """Aggregates from scratch: every device's latest survey (any generation)."""
+    agg = empty()
+    latest: Dict[str, Dict[str, Any]] = {}
+    if storage.STORE_BACKEND == "sqlite":   # the database holds the migrated files too
+        store = storage.get_store()
+        # profile.json rows first: like records.iter_surveys, the oldest generation
+        # counts when a device has nothing newer
+        rows = itertools.chain(store.export("profile"), store.export("survey"))
+        source = ((r["device_id"], r) for r in rows)
+    else:
+        source = ((r.device_id, r.raw) for r in records.iter_surveys(data_dir))
+    for device, rec in source:
+        agg["surveys"] += 1
+        latest[device] = rec
+    agg["participants"] = len(latest)
+    for rec in latest.values():
+        _apply(agg, rec, +1)
+    return agg
+
+def previous_survey(store, device_id: str) -> Optional[Dict[str, Any]]:
+    """A device's latest survey before a save (first pilots: survey.json / profile.json)."""
+    rec = store.latest(device_id, "survey")
+    if rec:
+        return rec
+    if storage.STORE_BACKEND == "sqlite":   # migrated into the profile table
+        return store.latest(device_id, "profile") or None
+    legacy = records.latest_survey(device_id)
+    return legacy.raw if legacy else None
+
+def store_surveys(store, device_id: str, save: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Store surveys of one device with save() (the store's append, oldest first) and fold
+    what it stored into data/aggregates.json. Reading the previous survey, storing and
+    folding happen under the device's SAVE_LOCK, so two saves of a device never both
+    replace the same earlier survey; the data folder's lock is only held for the fold.
+    Returns what save() returned.
+    """
+    path = _path()
+    current()   # built before anything is saved, so a rebuild never counts a save twice
+    with storage.device_lock(storage.jsonl_path(device_id, "survey"), SAVE_LOCK):
+        previous = previous_survey(store, device_id)
+        saved = save()
+        if not saved:
+            return saved
+        with storage.device_lock(path):
+            agg = _load(path)
+            if agg is None:   # removed meanwhile: count what is there (includes `saved`)
+                agg = rebuild()
+            else:
+                for rec in saved:
+                    _fold(agg, rec, previous)
+                    previous = rec
+            _save(path, agg)
+    return saved
+
+def current() -> Dict[str, Any]:
+    """The aggregates as last saved by any process (re-read only when the file changed)."""
+    path = _path()
+    try:
+        st_ = os.stat(path)
+        key = (st_.st_mtime_ns, st_.st_size)
+    except FileNotFoundError:
+        key = None
+    with _cache_lock:
+        hit = _cache.get(path)
+    if hit and key and hit[0] == key:
+        return hit[1]
+    agg = _load(path) if key else None
+    if agg is None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with storage.device_lock(path):
+            agg = _load(path) or rebuild()
+            _save(path, agg)
+        st_ = os.stat(path)
+        key = (st_.st_mtime_ns, st_.st_size)
+    with _cache_lock:
+        _cache[path] = (key, agg)
+    return agg
+
+def trait_means(agg: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """Big Five item -> cohort mean (1–7), None while no one answered it."""
+    return {k: stats(s)["mean"] for k, s in agg["big5"].items()}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Running study aggregates (data/aggregates.json).")
+    ap.add_argument("--data", default=storage.DATA_DIR)
+    ap.add_argument("--rebuild", action="store_true", help="recompute from the records")
+    args = ap.parse_args()
+    storage.DATA_DIR = args.data
+    if args.rebuild:
+        with storage.device_lock(_path()):
+            _save(_path(), rebuild(args.data))
+    agg = current()
+    print(f"participants {agg['participants']}  surveys {agg['surveys']}  by lang {agg['langs']}")
+    for k, s in agg["big5"].items():
+        st_ = stats(s)
+        print(f"  {k:11s} n={st_['n']:4d}  mean={st_['mean'] or 0:.2f}  sd={st_['sd'] or 0:.2f}")
+    for f in VIDEO_FIELDS:
+        print(f"  {f}: {agg[f]}")
+    sys.exit(0)
@@ -0,0 +1,346 @@
+# amm.py
+"""
+Local AMM inference engine: canonical survey answers -> predicted difficulty of the
+exercise (1–5, what video_q2 asks after doing it) and physiotherapy adherence (1–5,
+the pt_adherence scale). Everything runs offline, on the CPU.
+
+Backends (MENTALYTICS_AMM_BACKEND):
+
+    ridge   default. NumPy ridge regression on features.vectorize(); each target is
+            learned as a correction to a baseline (the participant's own expected
+            difficulty video_q1, resp. the scale midpoint), so it is usable from the
+            first labelled participants on and falls back to the baseline before.
+            Fitted from data/ at load, or read from MODEL_PATH (python amm.py train).
+    llama   a local GGUF model through llama-cpp-python (optional dependency),
+            path in MENTALYTICS_AMM_GGUF. Prompted per record, much slower.
+
+    engine = amm.load_engine()
+    engine.predict(records.canonical(survey))     # -> Prediction(difficulty, adherence, ...)
+    engine.predict_batch([...])                   # one matrix product for the ridge backend
+
+    service = amm.PredictionService()             # background predictions, one per (device, run)
+    service.submit(device_id, run_id, data)       # -> Future[Prediction]
+
+    python amm.py train        # fit on the data/ cohort, save MODEL_PATH
+    python amm.py score        # score every survey of the cohort, print latency
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Tuple
+
+import numpy as np
+
+import features
+import i18n
+import records
+
+# Optional local LLM backend
+try:
+    from llama_cpp import Llama
+    LLAMA_AVAILABLE = True
+except Exception:
+    LLAMA_AVAILABLE = False
+
+BACKEND = os.environ.get("MENTALYTICS_AMM_BACKEND", "ridge")   # ridge | llama
+MODEL_PATH = os.environ.get("MENTALYTICS_AMM_MODEL", os.path.join("models", "amm_ridge.npz"))
+GGUF_PATH = os.environ.get("MENTALYTICS_AMM_GGUF", "")
+
+TARGETS = ("difficulty", "adherence")
+SCALE = (1.0, 5.0)
+ALPHA = 10.0
+
+
+@dataclass
+class Prediction:
+    difficulty: float          # 1..5
+    adherence: float           # 1..5
+    backend: str
+    latency_ms: float          # share of the (batch) call for this record
+
+    @property
+    def difficulty_score(self) -> int:
+        """Rounded to the 1–5 NRS steps used by the charts."""
+        return int(round(self.difficulty))
+
+
+def labels(data: Dict[str, Any]) -> Tuple[float, float]:
+    """Observed targets of one canonical record (NaN where not answered)."""
+    difficulty = features._number(data.get("video_q2"))
+    opts = i18n.catalog(i18n.FALLBACK_LANG)["pt_adherence_opts"]
+    adherence = float(opts.index(data["pt_adherence"]) + 1) if data.get("pt_adherence") in opts else np.nan
+    return difficulty, adherence
+
+
+# -----------------
+#  RIDGE (NumPy)
+# -----------------
+_EXPECTED = features.FEATURE_NAMES.index("video_q1")
+
+def _baseline(X: np.ndarray) -> np.ndarray:
+    """(N, 2) prior: expected difficulty (video_q1, else 3) and the adherence midpoint."""
+    base = np.full((len(X), len(TARGETS)), 3.0)
+    expected = X[:, _EXPECTED]
+    base[:, 0] = np.where(np.isnan(expected), 3.0, expected)
+    return base
+
+
+class RidgeModel:
+    name = "ridge"
+
+    def __init__(self, coef: np.ndarray, intercept: np.ndarray, mean: np.ndarray,
+                 scale: np.ndarray, n_train: np.ndarray, alpha: float = ALPHA):
+        self.coef, self.intercept = coef, intercept          # (F, T), (T,)
+        self.mean, self.scale = mean, scale                  # (F,), (F,)
+        self.n_train, self.alpha = n_train, alpha
+
+    @classmethod
+    def fit(cls, X: np.ndarray, Y: np.ndarray, alpha: float = ALPHA) -> "RidgeModel":
+        """X (N, F) with NaN for missing answers, Y (N, T) with NaN for missing labels."""
+        X = np.asarray(X, dtype=np.float64)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)   # all-NaN columns
+            mean = np.nan_to_num(np.nanmean(X, axis=0)) if len(X) else np.zeros(X.shape[1])
+            scale = np.nan_to_num(np.nanstd(X, axis=0)) if len(X) else np.ones(X.shape[1])
+        scale[scale < 1e-6] = 1.0
+        Z = cls._standardize(X, mean, scale)
+        R = Y - _baseline(X)
+
+        F, T = X.shape[1], Y.shape[1]
+        coef, intercept, n_train = np.zeros((F, T)), np.zeros(T), np.zeros(T, dtype=np.int64)
+        for j in range(T):
+            rows = ~np.isnan(R[:, j])
+            n_train[j] = rows.sum()
+            if not n_train[j]:
+                continue
+            Zj, rj = Z[rows], R[rows, j]
+            intercept[j] = rj.mean()
+            coef[:, j] = np.linalg.solve(Zj.T @ Zj + alpha * np.eye(F), Zj.T @ (rj - intercept[j]))
+        return cls(coef, intercept, mean, scale, n_train, alpha)
+
+    @staticmethod
+    def _standardize(X: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+        X = np.where(np.isnan(X), mean, X)
+        return (X - mean) / scale
+
+    def predict_matrix(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        Y = self._standardize(X, self.mean, self.scale) @ self.coef + self.intercept + _baseline(X)
+        return np.clip(Y, *SCALE)
+
+    def predict(self, datas: List[Dict[str, Any]], X: Optional[np.ndarray] = None) -> np.ndarray:
+        return self.predict_matrix(features.matrix(datas) if X is None else X)
+
+    # ---- persistence ----
+    def save(self, path: str = MODEL_PATH):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        np.savez(path, coef=self.coef, intercept=self.intercept, mean=self.mean, scale=self.scale,
+                 n_train=self.n_train, alpha=self.alpha, layout=features.LAYOUT)
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> Optional["RidgeModel"]:
+        """None if missing or fitted for another feature layout."""
+        if not os.path.isfile(path):
+            return None
+        with np.load(path) as f:
+            if str(f["layout"]) != features.LAYOUT:
+                return None
+            return cls(f["coef"], f["intercept"], f["mean"], f["scale"], f["n_train"], float(f["alpha"]))
+
+
+def training_set(data_dir: str = "") -> Tuple[np.ndarray, np.ndarray]:
+    """(X, Y) over every valid survey of the cohort; X comes from the feature cache."""
+    recs = list(records.iter_surveys(data_dir, valid_only=True))
+    datas = [r.data for r in recs]
+    X = features.feature_store().vectors([(r.device_id, r.data) for r in recs])
+    Y = np.array([labels(d) for d in datas], dtype=np.float64).reshape(len(datas), len(TARGETS))
+    return X, Y
+
+def fit_ridge(data_dir: str = "", alpha: float = ALPHA) -> RidgeModel:
+    return RidgeModel.fit(*training_set(data_dir), alpha=alpha)
+
+
+# -----------------
+#  LLAMA.CPP (optional)
+# -----------------
+_PROMPT = (
+    "You predict how a participant experiences a 30-second sit-up exercise.\n"
+    "Participant answers:\n{answers}\n"
+    "Reply with two integers from 1 to 5: the difficulty they will report "
+    "(1 = not difficult, 5 = extremely difficult) and how closely they follow "
+    "physiotherapy (1 = not at all, 5 = always).\nDifficulty, adherence:"
+)
+_NUMBERS = re.compile(r"[1-5]")
+
+class LlamaModel:
+    name = "llama"
+
+    def __init__(self, path: str = GGUF_PATH):
+        self.llm = Llama(model_path=path, n_ctx=1024, verbose=False)
+        self._lock = threading.Lock()     # one context, not thread-safe
+
+    @staticmethod
+    def _answers(data: Dict[str, Any]) -> str:
+        skip = {"lang", "device_id", "timestamp", "run_id", "video_q2", "pt_adherence"}
+        lines = [f"- {k}: {v}" for k, v in data.items() if k not in skip and v not in (None, "", [], {})]
+        return "\n".join(lines)
+
+    def predict(self, datas: List[Dict[str, Any]], X: Optional[np.ndarray] = None) -> np.ndarray:
+        out = _baseline(features.matrix(datas) if X is None else X)
+        for i, data in enumerate(datas):
+            with self._lock:
+                text = self.llm(_PROMPT.format(answers=self._answers(data)),
+                                max_tokens=12, temperature=0.0)["choices"][0]["text"]
+            found = [float(n) for n in _NUMBERS.findall(text)[:len(TARGETS)]]
+            out[i, :len(found)] = found       # unparsable -> baseline
+        return out
+
+
+# -----------------
+#  ENGINE
+# -----------------
+class Engine:
+    """One loaded model + latency counters; shared by all sessions of the process."""
+
+    def __init__(self, model):
+        self.model = model
+        self.backend = model.name
+        self._lock = threading.Lock()
+        self.calls = self.records = 0
+        self.total_ms = self.last_ms = 0.0
+
+    def predict(self, data: Dict[str, Any], x: Optional[np.ndarray] = None) -> Prediction:
+        return self.predict_batch([data], None if x is None else x[None, :])[0]
+
+    def predict_batch(self, datas: List[Dict[str, Any]], X: Optional[np.ndarray] = None) -> List[Prediction]:
+        """X: the datas' feature vectors if already known (features.FeatureStore)."""
+        if not datas:
+            return []
+        t0 = time.perf_counter()
+        Y = self.model.predict(list(datas), X)
+        ms = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self.calls += 1
+            self.records += len(datas)
+            self.total_ms += ms
+            self.last_ms = ms
+        per = ms / len(datas)
+        return [Prediction(float(d), float(a), self.backend, per) for d, a in Y]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend, "calls": self.calls, "records": self.records,
+                "last_ms": round(self.last_ms, 3),
+                "mean_ms_per_record": round(self.total_ms / self.records, 4) if self.records else None,
+            }
+
+
+def load_engine(backend: str = "", data_dir: str = "") -> Engine:
+    """The configured backend; llama falls back to ridge if it isn't usable."""
+    backend = backend or BACKEND
+    if backend == "llama":
+        if LLAMA_AVAILABLE and os.path.isfile(GGUF_PATH):
+            return Engine(LlamaModel(GGUF_PATH))
+        warnings.warn("llama backend needs llama-cpp-python and MENTALYTICS_AMM_GGUF; using ridge")
+    return Engine(RidgeModel.load(MODEL_PATH) or fit_ridge(data_dir))
+
+
+class PredictionService:
+    """
+    Runs predictions on a small worker pool so pages never wait for the model.
+    One future per (device_id, run_id), kept once done: reloading the guidance page
+    or coming back to it returns the same result without recomputing. The engine
+    itself is loaded by the first job, in the pool.
+    """
+
+    def __init__(self, loader=load_engine, workers: int = 2, max_cached: int = 4096):
+        self._loader = loader
+        self._engine: Optional[Engine] = None
+        self._engine_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="amm")
+        self._futures: "OrderedDict[Tuple[str, str], Future]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_cached = max_cached
+
+    @property
+    def engine(self) -> Engine:
+        with self._engine_lock:
+            if self._engine is None:
+                self._engine = self._loader()
+            return self._engine
+
+    def get(self, device_id: str, run_id: str) -> Optional[Future]:
+        with self._lock:
+            fut = self._futures.get((device_id, run_id))
+            if fut is not None:
+                self._futures.move_to_end((device_id, run_id))
+            return fut
+
+    def submit(self, device_id: str, run_id: str, data: Dict[str, Any]) -> Future:
+        """The pending/finished prediction for this run, or a newly started one."""
+        key = (device_id, run_id)
+        with self._lock:
+            fut = self._futures.get(key)
+            if fut is not None:
+                return fut
+            fut = self._pool.submit(self._predict, device_id, data)
+            self._futures[key] = fut
+            while len(self._futures) > self.max_cached:
+                self._futures.popitem(last=False)
+        fut.add_done_callback(lambda f: f.exception() and self._forget(key, f))
+        return fut
+
+    def _predict(self, device_id: str, data: Dict[str, Any]) -> Prediction:
+        return self.engine.predict(data, features.feature_store().vector(device_id, data))
+
+    def _forget(self, key: Tuple[str, str], fut: Future):
+        """Failed predictions are not cached, the next view retries."""
+        with self._lock:
+            if self._futures.get(key) is fut:
+                del self._futures[key]
+
+
+def score_cohort(data_dir: str = "", engine: Optional[Engine] = None) -> List[Tuple["records.SurveyRecord", Prediction]]:
+    """Predictions for every valid survey of the study, in one batch."""
+    engine = engine or load_engine(data_dir=data_dir)
+    recs = list(records.iter_surveys(data_dir, valid_only=True))
+    X = features.feature_store().vectors([(r.device_id, r.data) for r in recs])
+    return list(zip(recs, engine.predict_batch([r.data for r in recs], X)))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local AMM engine: train the ridge model, score the cohort.")
+    ap.add_argument("command", choices=["train", "score"])
+    ap.add_argument("--data", default="")
+    ap.add_argument("--alpha", type=float, default=ALPHA)
+    ap.add_argument("--backend", default="")
+    args = ap.parse_args()
+
+    if args.command == "train":
+        X, Y = training_set(args.data)
+        model = RidgeModel.fit(X, Y, args.alpha)
+        model.save(MODEL_PATH)
+        fitted = model.predict_matrix(X)
+        for j, name in enumerate(TARGETS):
+            rows = ~np.isnan(Y[:, j])
+            mae = np.abs(fitted[rows, j] - Y[rows, j]).mean() if rows.any() else float("nan")
+            print(f"{name:10s} trained on {int(rows.sum()):4d} of {len(X)} surveys, in-sample MAE {mae:.2f}")
+        print(f"saved {MODEL_PATH} ({features.N_FEATURES} features, layout {features.LAYOUT})")
+    else:
+        engine = load_engine(args.backend, args.data)
+        scored = score_cohort(args.data, engine)
+        for rec, p in scored:
+            print(f"{rec.device_id}/{rec.source}#{rec.line}: difficulty {p.difficulty:.2f}  adherence {p.adherence:.2f}")
+        print(engine.stats())
+    sys.exit(0)
@@ -0,0 +1,191 @@
+# asset_store.py
+"""
+Asset pipeline (images, logos, theme stylesheet).
+
+- data_uri(): base64-encodes a file once per process (cache keyed by path + mtime).
+- publish() / picture_html(): write downscaled, recompressed variants (AVIF/WebP +
+  JPEG fallback, several widths) into static/img/ so Streamlit's static file serving
+  can hand them out, and let the browser pick the smallest one that fits its viewport.
+- stylesheet_html(): content-hashed <link> to static/theme.css instead of inlining it.
+
+Pillow is optional: without it, images are simply not resized (callers fall back to st.image).
+"""
+
+import os
+import base64
+import hashlib
+import mimetypes
+import shutil
+from functools import lru_cache
+from typing import Optional, List, Tuple, Dict
+
+# Optional image dep
+try:
+    from PIL import Image, features
+    PIL_AVAILABLE = True
+except Exception:
+    PIL_AVAILABLE = False
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(APP_DIR, "static")
+VARIANT_DIR = os.path.join(STATIC_DIR, "img")
+STATIC_URL = "app/static"       # where Streamlit serves ./static (server.enableStaticServing)
+
+WIDTHS = (360, 480, 640, 960, 1280)
+MODERN_FORMATS = (              # (Pillow format, file extension, mime, quality) – best first
+    ("AVIF", "avif", "image/avif", 55),
+    ("WEBP", "webp", "image/webp", 80),
+)
+FALLBACK_QUALITY = 82
+
+
+def _mtime(path: str) -> int:
+    return os.stat(path).st_mtime_ns
+
+def _tag(path: str, mtime: int) -> str:
+    """Short content tag: changes whenever the source file changes (cache busting)."""
+    return hashlib.sha1(f"{os.path.abspath(path)}:{mtime}".encode()).hexdigest()[:8]
+
+def _static_url(abs_path: str) -> str:
+    rel = os.path.relpath(abs_path, STATIC_DIR).replace(os.sep, "/")
+    return f"{STATIC_URL}/{rel}"
+
+
+# -----------------
+#  DATA URIs
+# -----------------
+@lru_cache(maxsize=64)
+def _encode(path: str, mtime: int) -> str:
+    mime, _ = mimetypes.guess_type(path)
+    with open(path, "rb") as f:
+        b64 = base64.b64encode(f.read()).decode("utf-8")
+    return f"data:{mime};base64,{b64}"
+
+def data_uri(path: str) -> str:
+    if not path or not os.path.isfile(path):
+        return ""
+    return _encode(path, _mtime(path))
+
+
+# -----------------
+#  STATIC VARIANTS
+# -----------------
+@lru_cache(maxsize=64)
+def _publish(path: str, mtime: int) -> str:
+    stem, ext = os.path.splitext(os.path.basename(path))
+    out = os.path.join(VARIANT_DIR, f"{stem}-{_tag(path, mtime)}{ext.lower()}")
+    if not os.path.isfile(out):
+        os.makedirs(VARIANT_DIR, exist_ok=True)
+        tmp = f"{out}.{os.getpid()}.tmp"
+        shutil.copyfile(path, tmp)
+        os.replace(tmp, out)
+    return _static_url(out)
+
+def publish(path: str) -> str:
+    """Copy an asset (e.g. a logo) under static/ once and return its URL ("" if missing)."""
+    if not path or not os.path.isfile(path):
+        return ""
+    return _publish(path, _mtime(path))
+
+def _modern_formats() -> List[Tuple[str, str, str, int]]:
+    return [f for f in MODERN_FORMATS if features.check(f[0].lower())]
+
+def _save(img, out: str, fmt: str, quality: int):
+    if not os.path.isfile(out):
+        tmp = f"{out}.{os.getpid()}.tmp"   # one per worker process
+        img.save(tmp, format=fmt, quality=quality)
+        os.replace(tmp, out)   # never serve a half-written file
+
+@lru_cache(maxsize=64)
+def _build_variants(path: str, mtime: int) -> Dict[str, object]:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    tag = _tag(path, mtime)
+    os.makedirs(VARIANT_DIR, exist_ok=True)
+
+    with Image.open(path) as src:
+        src.load()
+        full_w, full_h = src.size
+        widths = sorted({w for w in WIDTHS if w < full_w} | {min(full_w, WIDTHS[-1])})
+
+        sources: Dict[str, List[Tuple[str, int]]] = {}
+        fallback: List[Tuple[str, int]] = []
+        for w in widths:
+            h = max(1, round(full_h * w / full_w))
+            img = src.resize((w, h), Image.LANCZOS) if w != full_w else src.copy()
+            for fmt, ext, mime, quality in _modern_formats():
+                out = os.path.join(VARIANT_DIR, f"{stem}-{tag}-{w}.{ext}")
+                _save(img, out, fmt, quality)
+                sources.setdefault(mime, []).append((_static_url(out), w))
+            # JPEG fallback, flattened onto the (white) page background
+            flat = img.convert("RGBA")
+            bg = Image.new("RGB", flat.size, "white")
+            bg.paste(flat, mask=flat.getchannel("A"))
+            out = os.path.join(VARIANT_DIR, f"{stem}-{tag}-{w}.jpg")
+            _save(bg, out, "JPEG", FALLBACK_QUALITY)
+            fallback.append((_static_url(out), w))
+
+    return {"width": widths[-1], "height": round(full_h * widths[-1] / full_w),
+            "sources": sources, "fallback": fallback}
+
+def build_variants(path: str) -> Optional[Dict[str, object]]:
+    """Responsive variants of an image (built on first call, then cached until the file changes)."""
+    if not PIL_AVAILABLE or not path or not os.path.isfile(path):
+        return None
+    return _build_variants(path, _mtime(path))
+
+def picture_html(path: str, alt: str = "", sizes: str = "(max-width: 820px) 100vw, 820px") -> str:
+    """<picture> element with srcsets for every variant, "" if variants can't be built."""
+    v = build_variants(path)
+    if not v:
+        return ""
+    srcset = lambda items: ", ".join(f"{url} {w}w" for url, w in items)
+    sources = "".join(
+        f'<source type="{mime}" srcset="{srcset(items)}" sizes="{sizes}"/>'
+        for mime, items in v["sources"].items()
+    )
+    fallback = v["fallback"]
+    return (
+        f'<picture>{sources}'
+        f'<img src="{fallback[-1][0]}" srcset="{srcset(fallback)}" sizes="{sizes}" '
+        f'width="{v["width"]}" height="{v["height"]}" alt="{alt}" '
+        f'style="width:100%;height:auto;" decoding="async"/>'
+        f'</picture>'
+    )
+
+# -----------------
+#  STYLESHEETS
+# -----------------
+@lru_cache(maxsize=16)
+def _read_text(path: str, mtime: int) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def stylesheet_html(path: str) -> str:
+    """
+    <link> to a stylesheet under static/, versioned by a content hash: each rerun
+    only sends this tag, the CSS itself is downloaded once and cached by the browser.
+    """
+    css = _read_text(path, _mtime(path))
+    version = hashlib.sha1(css.encode("utf-8")).hexdigest()[:10]
+    return f'<link rel="stylesheet" href="{_static_url(os.path.abspath(path))}?v={version}"/>'
+
+def inline_css(path: str) -> str:
+    """Fallback when static serving is off: the whole stylesheet in a <style> tag."""
+    return f"<style>\n{_read_text(path, _mtime(path))}</style>"
+
+
+def warm(images=(), files=()):
+    """Build responsive variants / static copies up front (app startup, `python asset_store.py`)."""
+    for p in images:
+        build_variants(p)
+    for p in files:
+        publish(p)
+
+
+if __name__ == "__main__":
+    import sys
+    paths = sys.argv[1:] or [os.path.join("assets", f) for f in sorted(os.listdir("assets"))]
+    raster = (".jpg", ".jpeg", ".png", ".webp")
+    warm(images=[p for p in paths if os.path.splitext(p)[1].lower() in raster],
+         files=[p for p in paths if os.path.splitext(p)[1].lower() not in raster])
+    print(f"variants written to {VARIANT_DIR}")
@@ -0,0 +1,181 @@
+# bench/load_flow.py
+"""
+Load test: N simulated participants walk welcome -> consent -> survey -> guidance
+(bench/participant.py, random answers, languages in turn de/en/fr), spread over
+--procs processes that share one copy of the app and its data/ folder.
+
+Reports per step the p50 / p95 / p99 rerun time, reruns per second and bytes per
+rerun (serialized page elements). Exits 1 – CI-style – when a limit is crossed:
+
+    python bench/load_flow.py --participants 30 --procs 3
+    python bench/load_flow.py --max-p95 answer=120 --max-p95 save=400 --max-bytes 20000
+    python bench/load_flow.py --save bench/baseline.json          # record a baseline
+    python bench/load_flow.py --compare bench/baseline.json       # fail on >25 % regressions
+    python bench/load_flow.py --form                               # MENTALYTICS_SURVEY_MODE=form
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import tempfile
+import multiprocessing as mp
+from typing import Optional, List, Dict, Any
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import participant  # noqa: E402
+from scale_workers import _SKIP  # noqa: E402
+
+PERCENTILES = (50, 95, 99)
+
+
+def _worker(app_dir: str, proc: int, procs: int, participants: int, warmup: int,
+            form: bool, seed: int, out):
+    os.chdir(app_dir)
+    if form:
+        os.environ["MENTALYTICS_SURVEY_MODE"] = "form"
+    app = os.path.join(app_dir, "app.py")
+    rng = random.Random(seed * 1000 + proc)
+    for _ in range(warmup):
+        participant.walk(app, rng=rng, rerun_each=not form)
+
+    timings: Dict[str, List[float]] = {s: [] for s in participant.STEPS}
+    sizes: List[int] = []
+    failures: List[str] = []
+    t0, done = time.perf_counter(), 0
+    for i in range(proc, participants, procs):
+        lang = participant.LANGS[i % len(participant.LANGS)]
+        try:
+            run = participant.walk(app, lang, rng, rerun_each=not form)
+        except Exception as e:   # a broken flow is a result, not a crash of the bench
+            failures.append(f"participant {i} ({lang}): {e}")
+            continue
+        for step, values in run.timings.items():
+            timings[step] += values
+        sizes += run.bytes
+        done += 1
+    out.put({"timings": timings, "bytes": sizes, "failures": failures, "done": done,
+             "elapsed": time.perf_counter() - t0})
+
+
+def run_load(participants: int, procs: int, warmup: int = 1, form: bool = False,
+             seed: int = 0) -> Dict[str, Any]:
+    """Run the load test on a fresh copy of the app; returns the summary dict."""
+    app_dir = tempfile.mkdtemp(prefix="mentalytics-load-")
+    shutil.copytree(participant.ROOT, app_dir, dirs_exist_ok=True, ignore=_SKIP)
+    ctx = mp.get_context("spawn")
+    out = ctx.Queue()
+    workers = [ctx.Process(target=_worker, args=(app_dir, p, procs, participants, warmup, form, seed, out))
+               for p in range(procs)]
+    try:
+        for w in workers:
+            w.start()
+        results = [out.get() for _ in workers]
+        for w in workers:
+            w.join()
+    finally:
+        shutil.rmtree(app_dir, ignore_errors=True)
+
+    steps: Dict[str, Dict[str, float]] = {}
+    for step in participant.STEPS:
+        values = np.array([v for r in results for v in r["timings"][step]]) * 1000
+        if len(values):
+            steps[step] = {"n": int(len(values)),
+                           **{f"p{q}": float(np.percentile(values, q)) for q in PERCENTILES}}
+    sizes = [b for r in results for b in r["bytes"]]
+    reruns = sum(s["n"] for s in steps.values())
+    elapsed = max(r["elapsed"] for r in results)
+    return {
+        "participants": participants, "procs": procs, "form": form,
+        "steps": steps,
+        "reruns": reruns,
+        "reruns_per_s": reruns / elapsed if elapsed else 0.0,
+        "participants_per_s": sum(r["done"] for r in results) / elapsed if elapsed else 0.0,
+        "bytes_per_rerun": float(np.mean(sizes)) if sizes else 0.0,
+        "bytes_max": int(max(sizes)) if sizes else 0,
+        "failures": [f for r in results for f in r["failures"]],
+    }
+
+
+def report(summary: Dict[str, Any]):
+    print(f"{summary['participants']} participants, {summary['procs']} procs"
+          f"{' (form mode)' if summary['form'] else ''}")
+    print(f"{'step':10s} {'n':>5s} " + " ".join(f"{'p%d ms' % q:>8s}" for q in PERCENTILES))
+    for step, s in summary["steps"].items():
+        print(f"{step:10s} {s['n']:5d} " + " ".join(f"{s['p%d' % q]:8.1f}" for q in PERCENTILES))
+    print(f"participants/s {summary['participants_per_s']:.2f}   reruns/s {summary['reruns_per_s']:.1f}   "
+          f"bytes/rerun {summary['bytes_per_rerun']:.0f} (max {summary['bytes_max']})")
+    for f in summary["failures"]:
+        print(f"  failed: {f}")
+
+
+def check(summary: Dict[str, Any], max_p95: Dict[str, float], max_bytes: Optional[float],
+          baseline: Optional[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Every crossed limit, as a message; empty = pass."""
+    problems = list(summary["failures"])
+    for step, limit in max_p95.items():
+        p95 = summary["steps"].get(step, {}).get("p95")
+        if p95 is not None and p95 > limit:
+            problems.append(f"{step}: p95 {p95:.1f} ms > {limit:.1f} ms")
+    if max_bytes is not None and summary["bytes_per_rerun"] > max_bytes:
+        problems.append(f"bytes/rerun {summary['bytes_per_rerun']:.0f} > {max_bytes:.0f}")
+    if baseline:
+        for step, base in baseline["steps"].items():
+            p95 = summary["steps"].get(step, {}).get("p95")
+            if p95 is not None and p95 > base["p95"] * (1 + tolerance):
+                problems.append(f"{step}: p95 {p95:.1f} ms vs baseline {base['p95']:.1f} ms (+{tolerance:.0%} allowed)")
+        if summary["bytes_per_rerun"] > baseline["bytes_per_rerun"] * (1 + tolerance):
+            problems.append(f"bytes/rerun {summary['bytes_per_rerun']:.0f} vs baseline "
+                            f"{baseline['bytes_per_rerun']:.0f}")
+        if summary["reruns_per_s"] < baseline["reruns_per_s"] * (1 - tolerance):
+            problems.append(f"reruns/s {summary['reruns_per_s']:.1f} vs baseline {baseline['reruns_per_s']:.1f}")
+    return problems
+
+
+def _limits(pairs: List[str]) -> Dict[str, float]:
+    out = {}
+    for pair in pairs:
+        step, _, ms = pair.partition("=")
+        if step not in participant.STEPS or not ms:
+            raise SystemExit(f"--max-p95 expects STEP=MS with STEP in {participant.STEPS}, got {pair!r}")
+        out[step] = float(ms)
+    return out
+
+def main(argv: List[str] = None) -> int:
+    ap = argparse.ArgumentParser(description="Simulate N participants walking the full flow.")
+    ap.add_argument("--participants", type=int, default=12)
+    ap.add_argument("--procs", type=int, default=min(4, os.cpu_count() or 1))
+    ap.add_argument("--warmup", type=int, default=1, help="untimed participants per process")
+    ap.add_argument("--form", action="store_true", help="survey in form mode (one submit)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--max-p95", action="append", default=[], metavar="STEP=MS")
+    ap.add_argument("--max-bytes", type=float, default=None, help="limit for the mean bytes per rerun")
+    ap.add_argument("--save", metavar="JSON", help="write the summary (e.g. as a baseline)")
+    ap.add_argument("--compare", metavar="JSON", help="baseline to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed regression vs. baseline")
+    args = ap.parse_args(argv)
+
+    max_p95 = _limits(args.max_p95)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    summary = run_load(args.participants, args.procs, args.warmup, args.form, args.seed)
+    report(summary)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    problems = check(summary, max_p95, args.max_bytes, baseline, args.tolerance)
+    for p in problems:
+        print(f"FAIL: {p}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
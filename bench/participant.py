@@ -0,0 +1,128 @@
+# bench/participant.py
+"""
+One simulated participant walking the whole app with Streamlit's AppTest:
+
+    welcome -> language -> consent -> survey (random answers) -> save -> guidance -> agree
+
+AppTest runs app.py in-process exactly like a worker's script thread does, so the
+timings are the server-side cost of every rerun (script + disk), without network.
+Used by the load benchmarks in this folder.
+
+    import participant
+    timings = participant.walk(app_path, "de", random.Random(1))
+"""
+
+import os
+import sys
+import time
+import random
+import uuid
+from typing import Dict, List, Optional
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import i18n  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, "app.py")
+LANGS = ("de", "en", "fr")
+TIMEOUT = 60
+
+STEPS = ("welcome", "language", "consent", "answer", "save", "guidance", "agree")
+
+
+class Run:
+    """The AppTest of one participant + what each rerun cost."""
+
+    def __init__(self, app_path: str, device: str):
+        self.at = AppTest.from_file(app_path, default_timeout=TIMEOUT)
+        self.at.query_params["device"] = device
+        self.timings: Dict[str, List[float]] = {s: [] for s in STEPS}
+        self.bytes: List[int] = []
+
+    def rerun(self, step: str, action=None):
+        t0 = time.perf_counter()
+        (action or self.at.run)()
+        self.timings[step].append(time.perf_counter() - t0)
+        if self.at.exception:
+            raise RuntimeError(f"{step}: {self.at.exception[0].message}")
+        self.bytes.append(_tree_bytes(self.at))
+
+    @property
+    def step(self) -> str:
+        return self.at.session_state["step"]
+
+
+def _tree_bytes(at: AppTest) -> int:
+    """Serialized size of every element of the rendered page (≈ what the browser receives)."""
+    total, stack = 0, [at._tree]
+    while stack:
+        node = stack.pop()
+        proto = getattr(node, "proto", None)
+        if proto is not None and hasattr(proto, "ByteSize"):
+            total += proto.ByteSize()
+        children = getattr(node, "children", None)
+        if isinstance(children, dict):
+            stack.extend(children.values())
+    return total
+
+
+def _next_question(at: AppTest, done: set):
+    for kind in ("selectbox", "radio", "multiselect", "text_input"):
+        for w in getattr(at, kind):
+            if w.key and w.key not in done and (kind != "text_input" or w.key.endswith("__other")):
+                return kind, w
+    return None, None
+
+def _answer_survey(run: Run, rng: random.Random, rerun_each: bool):
+    """Random answer for every question, one rerun per answer like a real phone."""
+    at, done = run.at, set()
+    while True:
+        # questions come and go with the answers (surgery follow-ups, "please specify")
+        kind, w = _next_question(at, done)
+        if w is None:
+            return
+        done.add(w.key)
+        if kind == "multiselect":
+            w.set_value(rng.sample(list(w.options), k=rng.randint(1, 3)))
+        elif kind == "text_input":
+            w.set_value("bench")
+        else:
+            w.set_value(rng.choice(list(w.options)))
+        if rerun_each:
+            run.rerun("answer")
+
+
+def walk(app_path: str = APP_PATH, lang: Optional[str] = None, rng: Optional[random.Random] = None,
+         device: str = "", rerun_each: bool = True) -> Run:
+    """Drive one participant through the full flow; returns its Run (timings per step)."""
+    rng = rng or random.Random()
+    lang = lang or rng.choice(LANGS)
+    run = Run(app_path, device or "B" + uuid.uuid4().hex[:5].upper())
+    at = run.at
+
+    run.rerun("welcome")
+    run.rerun("language", at.button[i18n.LANGUAGES.index(lang)].click().run)
+
+    for cb in at.checkbox:
+        cb.check()
+    run.rerun("consent")
+    run.rerun("consent", at.button[0].click().run)
+
+    _answer_survey(run, rng, rerun_each)
+    for _ in range(2):   # 2nd try: a "please specify" field that only appeared on save
+        save = [b for b in at.button if b.proto.type == "primary"][0]
+        run.rerun("save", save.click().run)
+        if run.step == "guidance":
+            break
+        for ti in list(at.text_input):
+            if ti.key and ti.key.endswith("__other") and not ti.value:
+                ti.input("bench")
+    if run.step != "guidance":
+        raise RuntimeError(f"survey not accepted: {[e.value for e in at.error]}")
+    run.rerun("guidance")
+
+    at.checkbox(key="agree_model").check()
+    run.rerun("agree", at.button(key="save_agree_btn").click().run)
+    return run
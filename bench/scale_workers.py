@@ -0,0 +1,91 @@
+# bench/scale_workers.py
+"""
+Does the app scale with worker processes? Runs the full participant flow
+(bench/participant.py) in 1, 2, 4, ... processes at once – one process standing for
+one app worker of deploy/workers.py – all sharing the same data/ folder, and reports
+participants/s and reruns/s per worker count.
+
+Streamlit runs every session of a process under one GIL, so a single worker tops out
+at about one core however many phones are connected; with N workers the script
+reruns of different participants run on N cores. On a machine with C cores the
+throughput should grow roughly linearly up to C workers. --min-speedup makes it fail
+(exit 1) when the largest worker count doesn't reach that speedup over 1 worker.
+
+    python bench/scale_workers.py --workers 1 2 4 --participants 6
+"""
+
+import os
+import sys
+import time
+import shutil
+import random
+import argparse
+import tempfile
+import multiprocessing as mp
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import participant  # noqa: E402
+
+_SKIP = shutil.ignore_patterns(".git", "data", "study", "features", "models", "bench", "doc")
+
+
+def _worker(app_dir: str, seed: int, participants: int, ready, start, out):
+    os.chdir(app_dir)   # data/ and static/ of the shared copy, like a deployed worker
+    app = os.path.join(app_dir, "app.py")
+    rng = random.Random(seed)
+    participant.walk(app, rng=rng)   # warm-up: imports, caches, image variants
+    ready.wait()
+    start.wait()
+    t0, reruns = time.perf_counter(), 0
+    for _ in range(participants):
+        run = participant.walk(app, rng=rng)
+        reruns += sum(len(v) for v in run.timings.values())
+    out.put((participants, reruns, time.perf_counter() - t0))
+
+def measure(app_dir: str, workers: int, participants: int) -> Tuple[float, float]:
+    """(participants/s, reruns/s) with `workers` processes walking at the same time."""
+    ctx = mp.get_context("spawn")
+    ready, start, out = ctx.Barrier(workers + 1), ctx.Barrier(workers + 1), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(app_dir, w, participants, ready, start, out))
+             for w in range(workers)]
+    for p in procs:
+        p.start()
+    ready.wait()
+    t0 = time.perf_counter()
+    start.wait()
+    results = [out.get() for _ in procs]
+    wall = time.perf_counter() - t0
+    for p in procs:
+        p.join()
+    return sum(r[0] for r in results) / wall, sum(r[1] for r in results) / wall
+
+
+def main(argv: List[str] = None) -> int:
+    ap = argparse.ArgumentParser(description="Throughput of the participant flow vs. number of worker processes.")
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--participants", type=int, default=4, help="timed participants per worker")
+    ap.add_argument("--min-speedup", type=float, default=0.0)
+    args = ap.parse_args(argv)
+
+    app_dir = tempfile.mkdtemp(prefix="mentalytics-scale-")
+    shutil.copytree(participant.ROOT, app_dir, dirs_exist_ok=True, ignore=_SKIP)
+    print(f"{os.cpu_count()} CPUs, shared app copy in {app_dir}")
+    print(f"{'workers':>7} {'participants/s':>15} {'reruns/s':>9} {'speedup':>8}")
+    base = speedup = None
+    try:
+        for n in sorted(set(args.workers)):
+            pps, rps = measure(app_dir, n, args.participants)
+            base = base or rps
+            speedup = rps / base
+            print(f"{n:7d} {pps:15.2f} {rps:9.1f} {speedup:7.2f}x")
+    finally:
+        shutil.rmtree(app_dir, ignore_errors=True)
+    if args.min_speedup and speedup < args.min_speedup:
+        print(f"FAIL: speedup {speedup:.2f}x < {args.min_speedup}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# bench/stress_writes.py
+"""
+Stress test for concurrent writes to ONE device folder.
+
+Spawns --procs worker processes (like several app workers) with --sessions threads
+each (like browser tabs sharing ?device=), all appending survey-sized records to the
+same data/<DEVICE>/survey.jsonl. Afterwards every line must parse, the record count
+must match and the offset index must point at every record.
+
+    python bench/stress_writes.py --procs 4 --sessions 12 --records 50
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import storage  # noqa: E402
+
+DEVICE = "STRESS"
+
+
+def _payload(proc: int, session: int, i: int) -> dict:
+    return {
+        "device_id": DEVICE, "proc": proc, "session": session, "i": i,
+        "lang": "de", "employment": "Beschäftigt", "activities": ["Kraft-/Widerstandstraining"],
+        "big5": {k: "Stimme eher zu" for k in ("extrav", "quarrel", "discipline", "anxious", "open",
+                                               "quiet", "warm", "careless", "stable", "uncreative")},
+        "pad": "x" * (i % 7) * 300,   # vary the line length
+    }
+
+def _worker(data_dir: str, proc: int, sessions: int, records: int):
+    storage.DATA_DIR = data_dir
+
+    def session(s: int):
+        for i in range(records):
+            storage.append_jsonl(DEVICE, "survey", _payload(proc, s, i))
+
+    threads = [threading.Thread(target=session, args=(s,)) for s in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+def check(data_dir: str, expected: int) -> list:
+    storage.DATA_DIR = data_dir
+    path = storage.jsonl_path(DEVICE, "survey")
+    errors, seen = [], set()
+    with open(path, "rb") as f:
+        lines = f.read().split(b"\n")
+    if lines[-1] != b"":
+        errors.append("file does not end with a newline")
+    lines = [l for l in lines if l.strip()]
+    for n, line in enumerate(lines):
+        try:
+            rec = json.loads(line.decode("utf-8"))
+            seen.add((rec["proc"], rec["session"], rec["i"]))
+        except Exception as e:
+            errors.append(f"line {n + 1} does not parse: {e}")
+    if len(lines) != expected or len(seen) != expected:
+        errors.append(f"expected {expected} records, found {len(lines)} lines / {len(seen)} unique")
+    if storage.count_jsonl(DEVICE, "survey") != len(lines):
+        errors.append(f"index has {storage.count_jsonl(DEVICE, 'survey')} entries for {len(lines)} lines")
+    for n in range(len(lines)):
+        if storage.load_nth_jsonl(DEVICE, "survey", n) != json.loads(lines[n]):
+            errors.append(f"index entry {n} does not point at line {n + 1}")
+            break
+    return errors
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--procs", type=int, default=4)
+    ap.add_argument("--sessions", type=int, default=12, help="threads per process")
+    ap.add_argument("--records", type=int, default=50, help="records per session")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        t0 = time.perf_counter()
+        procs = [mp.Process(target=_worker, args=(data_dir, p, args.sessions, args.records))
+                 for p in range(args.procs)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - t0
+
+        expected = args.procs * args.sessions * args.records
+        errors = check(data_dir, expected)
+        print(f"{args.procs} procs x {args.sessions} sessions x {args.records} records = {expected} "
+              f"in {elapsed:.2f}s ({expected / elapsed:.0f} records/s)")
+        for e in errors[:20]:
+            print("FAIL:", e)
+        if errors or any(p.exitcode for p in procs):
+            sys.exit(1)
+        print("OK: every line parses and is indexed")
+
+
+if __name__ == "__main__":
+    main()
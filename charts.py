@@ -0,0 +1,144 @@
+# charts.py
+"""
+Vega-Lite specs for the guidance page charts.
+
+The static part of each chart (marks, encodings, scales, axis/theme config, localized
+titles) is built with Altair once per language and kept as a template that reads its
+rows from a named dataset. A render only injects the participant's values; the
+resulting spec is memoized per (language, scores) and handed out as a shallow
+copy, so reruns – e.g. ticking the "agree" checkbox – don't rebuild anything.
+
+    st.vega_lite_chart(charts.difficulty_spec(lang, 4), use_container_width=True)
+"""
+
+from functools import lru_cache
+from typing import Dict, Any, Tuple
+
+import i18n
+
+# Optional chart dep
+try:
+    import altair as alt
+    ALTAIR_AVAILABLE = True
+except Exception:
+    ALTAIR_AVAILABLE = False
+
+DATASET = "values"
+TRAITS = ("Extroversion", "Agreeableness", "Conscientiousness", "Emotional_Stability", "Openness")
+TRAIT_LABEL_KEYS = ("trait_ext", "trait_agr", "trait_con", "trait_emo", "trait_ope")
+
+_THEME = dict(grid=True, gridColor="#e2e8f0", labelColor="#0f172a", titleColor="#0f172a")
+_PADDING = {"left": 10, "right": 10, "top": 10, "bottom": 10}
+
+
+# -----------------
+#  TEMPLATES (once per language)
+# -----------------
+@lru_cache(maxsize=None)
+def _difficulty_template(lang: str) -> Dict[str, Any]:
+    tr = i18n.catalog(lang)
+    base = alt.Chart(alt.Data(name=DATASET)).properties(height=280)
+
+    bars = (
+        base.mark_bar(size=30, cornerRadiusTopLeft=6, cornerRadiusBottomLeft=6, opacity=0.95)
+        .encode(
+            y=alt.Y("Exercise:O", sort=None, axis=alt.Axis(title=None)),
+            x=alt.X("NumericScore:Q",
+                    title=tr["nrs"],
+                    scale=alt.Scale(domain=[0, 5], nice=False, zero=True),
+                    axis=alt.Axis(tickMinStep=1)),
+            color=alt.value("#2563eb"),
+            tooltip=[alt.Tooltip("Exercise:N"),
+                     alt.Tooltip("NumericScore:Q", title=tr["score_word"])],
+        )
+    )
+
+    labels = (
+        base.mark_text(dx=6, fontSize=12, align="left")
+        .encode(
+            y=alt.Y("Exercise:O", sort=None),
+            x=alt.X("NumericScore:Q"),
+            text=alt.Text("ScoreLabel:N"),
+        )
+    )
+
+    chart = (
+        alt.layer(bars, labels)
+          .properties(padding=_PADDING)
+          .configure(background="white")
+          .configure_view(stroke=None)
+          .configure_axis(**_THEME)
+    )
+    return chart.to_dict()
+
+@lru_cache(maxsize=None)
+def _traits_template(lang: str, group_key: str) -> Dict[str, Any]:
+    tr = i18n.catalog(lang)
+    # fixed order of the 5 traits to ensure that they are all displayed
+    order_traits = [tr[k] for k in TRAIT_LABEL_KEYS]
+    groups = [tr[group_key], tr["group_user"]]
+
+    chart = (
+        alt.Chart(alt.Data(name=DATASET))
+        .properties(height=300, padding=_PADDING)
+        .mark_bar(cornerRadiusTopLeft=6, cornerRadiusTopRight=6)
+        .encode(
+            x=alt.X(
+                "Trait:N",
+                sort=order_traits,
+                axis=alt.Axis(labelAngle=0, labelFontSize=4, title=None,
+                              labelColor="#0f172a", labelLimit=140),
+            ),
+            y=alt.Y("Score:Q", scale=alt.Scale(domain=[0, 7]), title=tr["amm_score"]),
+            xOffset=alt.X("Group:N", sort=groups),
+            color=alt.Color(
+                "Group:N",
+                sort=groups,
+                legend=alt.Legend(title=tr["group"], orient="bottom", columns=2,
+                                  labelColor="#0f172a", titleColor="#0f172a"),
+                scale=alt.Scale(range=["#9ca3af", "#2563eb"]),  # Norms = gray, User = blue
+            ),
+            tooltip=["Trait:N", "Group:N", "Score:Q"],
+        )
+    ).configure(background="white") \
+     .configure_view(stroke=None) \
+     .configure_axis(**_THEME)
+    return chart.to_dict()
+
+
+# -----------------
+#  PER-RENDER SPECS (memoized)
+# -----------------
+# The cached specs are shared between sessions: callers get a shallow copy, which
+# is all st.vega_lite_chart changes (it pops top-level keys such as "datasets").
+def _with_rows(template: Dict[str, Any], rows: list) -> Dict[str, Any]:
+    return {**template, "datasets": {DATASET: rows}}
+
+@lru_cache(maxsize=256)
+def _difficulty(lang: str, score: int) -> Dict[str, Any]:
+    tr = i18n.catalog(lang)
+    rows = [{"Exercise": tr["ex_situps"], "NumericScore": score, "ScoreLabel": tr.get(f"diff{score}")}]
+    return _with_rows(_difficulty_template(lang), rows)
+
+@lru_cache(maxsize=1024)
+def _traits(lang: str, user: Tuple[float, ...], norms: Tuple[float, ...], group_key: str) -> Dict[str, Any]:
+    tr = i18n.catalog(lang)
+    rows = []
+    for label_key, n, u in zip(TRAIT_LABEL_KEYS, norms, user):
+        rows += [
+            {"Trait": tr[label_key], "Group": tr[group_key], "Score": n},
+            {"Trait": tr[label_key], "Group": tr["group_user"], "Score": u},
+        ]
+    return _with_rows(_traits_template(lang, group_key), rows)
+
+def difficulty_spec(lang: str, score: int) -> Dict[str, Any]:
+    """Bar with the participant's 1–5 difficulty rating."""
+    return dict(_difficulty(lang, int(score)))
+
+def traits_spec(lang: str, user: Tuple[float, ...], norms: Tuple[float, ...],
+                group_key: str = "group_norm") -> Dict[str, Any]:
+    """
+    Grouped bars: norms (or the cohort means, group_key="group_cohort") vs.
+    participant, both in TRAITS order.
+    """
+    return dict(_traits(lang, tuple(user), tuple(norms), group_key))
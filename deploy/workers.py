@@ -0,0 +1,86 @@
+# deploy/workers.py
+"""
+Booth mode: runs several `streamlit run app.py` workers on consecutive local ports,
+to be put behind the reverse proxy of deploy/nginx.conf or deploy/Caddyfile.
+
+    python deploy/workers.py                  # one worker per CPU core, ports 8601…
+    python deploy/workers.py --workers 4 --base-port 8601
+    python deploy/workers.py --sync-port 0    # without the offline client (sync_server.py)
+
+All workers share the app folder, so they read and append the same data/ tree (or
+the same SQLite file with MENTALYTICS_STORE=sqlite); the stores lock per device
+folder / use WAL for that. A worker that dies is restarted; Ctrl+C stops them all.
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import subprocess
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def worker_cmd(port: int, address: str, extra: List[str]) -> List[str]:
+    return [
+        sys.executable, "-m", "streamlit", "run", os.path.join(ROOT, "app.py"),
+        "--server.port", str(port),
+        "--server.address", address,
+        "--server.headless", "true",
+        "--browser.gatherUsageStats", "false",
+        *extra,
+    ]
+
+def sync_cmd(port: int, address: str) -> List[str]:
+    return [sys.executable, os.path.join(ROOT, "sync_server.py"), "--port", str(port), "--address", address]
+
+def main(argv: List[str] = None) -> int:
+    ap = argparse.ArgumentParser(description="Start N app workers for the reverse proxy.")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--base-port", type=int, default=8601)
+    ap.add_argument("--address", default="127.0.0.1", help="workers listen here; only the proxy is public")
+    ap.add_argument("--sync-port", type=int, default=8502, help="offline client + sync endpoint, 0 = off")
+    ap.add_argument("extra", nargs=argparse.REMAINDER, help="passed on to streamlit run (after --)")
+    args = ap.parse_args(argv)
+    extra = [a for a in args.extra if a != "--"]
+
+    if args.workers < 1:
+        ap.error("--workers must be at least 1")
+    ports = [args.base_port + i for i in range(args.workers)]
+    if args.sync_port in ports:
+        ap.error(f"--sync-port {args.sync_port} is one of the worker ports "
+                 f"{ports[0]}-{ports[-1]}; pick another port or --base-port")
+    procs = {}
+
+    def start(port: int):
+        cmd = sync_cmd(port, args.address) if port == args.sync_port else worker_cmd(port, args.address, extra)
+        procs[port] = subprocess.Popen(cmd, cwd=ROOT)
+        print(f"{'sync server' if port == args.sync_port else 'worker'} on {args.address}:{port} "
+              f"(pid {procs[port].pid})", flush=True)
+
+    def stop(*_):
+        for p in procs.values():
+            p.terminate()
+        for p in procs.values():
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for port in ports + ([args.sync_port] if args.sync_port else []):
+        start(port)
+    while True:
+        time.sleep(2)
+        for port, p in list(procs.items()):
+            if p.poll() is not None:
+                print(f"worker on port {port} exited ({p.returncode}), restarting", flush=True)
+                start(port)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# drafts.py
+"""
+Draft persistence: a phone that reloads or loses the connection resumes where the
+participant left off instead of starting again at the welcome page.
+
+A draft is a small snapshot of one device's session –
+
+    {"step": "survey", "lang": "de", "answers": {"age": "34", "b5_extrav": "…", …},
+     "updated": "2025-10-02T14:03:11"}
+
+– kept by the store next to the device's records (data/<DEVICE_ID>/draft.json, or
+the _drafts table of the SQLite backend). Only the newest snapshot matters, so
+writes are debounced and coalesced: sessions hand snapshots to one writer thread
+per process, which writes a device once it has been quiet for DRAFT_DELAY (or at
+the latest DRAFT_MAX_DELAY after its first unsaved change) and drops snapshots
+equal to the one already stored. Step changes are written at once.
+
+    MENTALYTICS_DRAFT_DELAY_MS=1500       quiet time before a draft is written
+    MENTALYTICS_DRAFT_MAX_DELAY_MS=10000  ... but at least this often while answering
+    MENTALYTICS_DRAFT_MAX_AGE_H=24        older drafts are not resumed
+
+    python drafts.py <DEVICE_ID>          # show a device's draft
+    python drafts.py <DEVICE_ID> --clear  # drop it (the next visit starts fresh)
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import datetime
+import argparse
+import threading
+from typing import Optional, Dict, Tuple
+
+import storage
+
+DRAFT_DELAY = float(os.environ.get("MENTALYTICS_DRAFT_DELAY_MS", "1500")) / 1000
+DRAFT_MAX_DELAY = float(os.environ.get("MENTALYTICS_DRAFT_MAX_DELAY_MS", "10000")) / 1000
+DRAFT_MAX_AGE = datetime.timedelta(hours=float(os.environ.get("MENTALYTICS_DRAFT_MAX_AGE_H", "24")))
+
+
+class DraftWriter:
+    """
+    put() is a dict update under a lock – sessions never wait for the disk. The
+    thread writes due drafts; flush() writes everything pending (at exit, in tests).
+    """
+
+    def __init__(self, store=None, delay: float = DRAFT_DELAY, max_delay: float = DRAFT_MAX_DELAY):
+        self._store = store
+        self.delay, self.max_delay = delay, max_delay
+        # device -> (snapshot JSON, due at, write at the latest)
+        self._pending: Dict[str, Tuple[str, float, float]] = {}
+        self._saved: Dict[str, int] = {}   # device -> hash of the stored snapshot
+        self._cond = threading.Condition()
+        self._io = threading.Lock()        # one device's writes stay in order
+        threading.Thread(target=self._run, name="draft-writer", daemon=True).start()
+
+    @property
+    def store(self):
+        return self._store or storage.get_store()
+
+    def put(self, device_id: str, draft: dict, immediate: bool = False):
+        body = json.dumps(draft, sort_keys=True, ensure_ascii=False)
+        now = time.monotonic()
+        with self._cond:
+            pending = self._pending.get(device_id)
+            if pending is None and self._saved.get(device_id) == hash(body):
+                return
+            latest = pending[2] if pending else now + self.max_delay
+            due = now if immediate else min(now + self.delay, latest)
+            self._pending[device_id] = (body, due, latest)
+            self._cond.notify()
+
+    def load(self, device_id: str) -> dict:
+        """The device's draft (a pending one first), {} if none or older than DRAFT_MAX_AGE."""
+        with self._cond:
+            pending = self._pending.get(device_id)
+        if pending:
+            return json.loads(pending[0])
+        draft = self.store.load_draft(device_id)
+        try:
+            updated = datetime.datetime.fromisoformat(draft.get("updated", ""))
+        except ValueError:
+            return {}
+        if datetime.datetime.now() - updated > DRAFT_MAX_AGE:
+            return {}
+        draft.pop("updated")
+        with self._cond:
+            self._saved[device_id] = hash(json.dumps(draft, sort_keys=True, ensure_ascii=False))
+        return draft
+
+    def clear(self, device_id: str):
+        with self._io:
+            with self._cond:
+                self._pending.pop(device_id, None)
+                self._saved.pop(device_id, None)
+            self.store.clear_draft(device_id)
+
+    def flush(self):
+        self._write_due(float("inf"))
+
+    def _write_due(self, now: float):
+        with self._io:
+            with self._cond:
+                due = [(d, p[0]) for d, p in self._pending.items() if p[1] <= now]
+                for device_id, _ in due:
+                    del self._pending[device_id]
+            for device_id, body in due:
+                draft = json.loads(body)
+                draft["updated"] = datetime.datetime.now().isoformat(timespec="seconds")
+                try:
+                    self.store.save_draft(device_id, draft)
+                except Exception as e:   # a lost draft only costs a resume, never the session
+                    print(f"drafts: could not save {device_id}: {e}", file=sys.stderr)
+                    continue
+                with self._cond:
+                    self._saved[device_id] = hash(body)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    next_due = min((p[1] for p in self._pending.values()), default=None)
+                    if next_due is not None and next_due <= now:
+                        break
+                    self._cond.wait(None if next_due is None else next_due - now)
+            self._write_due(now)
+
+
+_writer: Optional[DraftWriter] = None
+_writer_lock = threading.Lock()
+
+def get_writer() -> DraftWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = DraftWriter()
+            atexit.register(_writer.flush)
+        return _writer
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Show or clear a device's draft.")
+    ap.add_argument("device")
+    ap.add_argument("--clear", action="store_true")
+    args = ap.parse_args()
+    store = storage.get_store()
+    if args.clear:
+        store.clear_draft(args.device)
+        print(f"cleared draft of {args.device}")
+    else:
+        print(json.dumps(store.load_draft(args.device) or None, ensure_ascii=False, indent=2))
+    sys.exit(0)
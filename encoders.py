@@ -0,0 +1,132 @@
+# encoders.py
+"""
+Vectorized answer encoders for whole cohorts.
+
+encode_likert() maps a column of Big Five answers – Likert words in any UI
+language, or "1".."7" from the first pilot – to 1..7 in one pass: the column is
+factorized, only its distinct tokens are looked up, and the codes are broadcast
+back with NumPy. Unknown tokens are returned (with counts) instead of being
+silently scored as 4.
+
+    import records, encoders
+    df = encoders.surveys_frame(records.iter_surveys())
+    scores, unknown = encoders.encode_big5(df)
+
+    python encoders.py [DATA_DIR]   # encode the study's surveys
+    python encoders.py --check      # self-check of the encodings
+"""
+
+from typing import Dict, Any, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+import i18n
+import records
+
+BIG5_KEYS = records.BIG5_KEYS
+
+# Trait -> item shown on the guidance page (one item per trait, as in page_guidance)
+TRAIT_ITEMS = {
+    "Extroversion": "extrav",
+    "Agreeableness": "warm",
+    "Conscientiousness": "discipline",
+    "Emotional_Stability": "stable",
+    "Openness": "open",
+}
+
+
+def _likert_vocab() -> Dict[str, int]:
+    vocab = {str(i): i for i in range(1, 8)}
+    for lang in i18n.LANGUAGES:
+        for i, word in enumerate(i18n.catalog(lang)["likert7"], start=1):
+            vocab.setdefault(str(word).strip().lower(), i)
+    return vocab
+
+LIKERT_VOCAB = _likert_vocab()
+NRS_VOCAB = {str(i): i for i in range(1, 6)}
+
+
+def _token(u: Any) -> str:
+    # a numeric column with a missing value is float64: 3.0 is the answer "3"
+    if isinstance(u, (float, np.floating)) and float(u).is_integer():
+        return str(int(u))
+    return str(u).strip().lower()
+
+def _encode(values: Any, vocab: Dict[str, int], strict: bool) -> Tuple[pd.Series, Dict[str, int]]:
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    keys = [_token(u) for u in uniques]
+    lut = np.array([vocab.get(k, 0) for k in keys] + [0], dtype=np.int8)   # last slot: NA
+    out = lut[np.where(codes < 0, len(keys), codes)]
+
+    unknown: Dict[str, int] = {}
+    bad = [i for i, k in enumerate(keys) if k not in vocab]
+    if bad:
+        counts = np.bincount(codes[codes >= 0], minlength=len(keys))
+        unknown = {str(uniques[i]): int(counts[i]) for i in bad}
+        if strict:
+            raise ValueError(f"unknown answers: {unknown}")
+    encoded = pd.arrays.IntegerArray(out, mask=out == 0)   # 0 = missing / unknown
+    return pd.Series(encoded, index=s.index, name=s.name), unknown
+
+def encode_likert(values: Any, strict: bool = False) -> Tuple[pd.Series, Dict[str, int]]:
+    """Likert answers (any language or digits) -> Int8 1..7 (NA if missing/unknown), unknown tokens."""
+    return _encode(values, LIKERT_VOCAB, strict)
+
+def encode_nrs(values: Any, strict: bool = False) -> Tuple[pd.Series, Dict[str, int]]:
+    """NRS / 1–5 answers (ints or "1".."5") -> Int8 1..5, unknown tokens."""
+    return _encode(values, NRS_VOCAB, strict)
+
+
+def surveys_frame(recs: Iterable["records.SurveyRecord"]) -> pd.DataFrame:
+    """Canonical survey records -> one row per record, big5 flattened to big5_<item>."""
+    rows = []
+    for r in recs:
+        row = {k: v for k, v in r.data.items() if k != "big5"}
+        row.update({f"big5_{k}": (r.data.get("big5") or {}).get(k) for k in BIG5_KEYS})
+        row.update(source=r.source, line=r.line)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def encode_big5(df: pd.DataFrame, strict: bool = False) -> Tuple[pd.DataFrame, Dict[str, Dict[str, int]]]:
+    """Every big5_<item> column of `df` encoded to 1..7; unknown tokens per column."""
+    out, unknown = {}, {}
+    for k in BIG5_KEYS:
+        col = f"big5_{k}"
+        if col in df:
+            out[col], bad = encode_likert(df[col], strict)
+            if bad:
+                unknown[col] = bad
+    return pd.DataFrame(out, index=df.index), unknown
+
+def trait_scores(encoded_big5: pd.DataFrame) -> pd.DataFrame:
+    """The five traits plotted on the guidance page, one row per participant."""
+    return pd.DataFrame({trait: encoded_big5[f"big5_{item}"] for trait, item in TRAIT_ITEMS.items()})
+
+
+def _check():
+    """Encodings that must hold (python encoders.py --check)."""
+    nrs, unknown = encode_nrs(pd.Series([3, None, 5]))   # float64 with NaN
+    assert nrs.tolist() == [3, pd.NA, 5] and not unknown, (nrs.tolist(), unknown)
+    nrs, unknown = encode_nrs(pd.Series([1.0, 2.5, np.nan, "4"], dtype=object))
+    assert nrs.tolist() == [1, pd.NA, pd.NA, 4] and unknown == {"2.5": 1}, (nrs.tolist(), unknown)
+    likert, unknown = encode_likert(pd.Series([7.0, None, "1"]))
+    assert likert.tolist() == [7, pd.NA, 1] and not unknown, (likert.tolist(), unknown)
+    print("encoders: ok")
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    if sys.argv[1:] == ["--check"]:
+        _check()
+        sys.exit(0)
+    t0 = time.perf_counter()
+    df = surveys_frame(records.iter_surveys(sys.argv[1] if len(sys.argv) > 1 else ""))
+    scores, unknown = encode_big5(df)
+    nrs, nrs_unknown = encode_nrs(df.get("video_q2", pd.Series(dtype=object)))
+    print(f"{len(df)} surveys encoded in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    print(trait_scores(scores).describe().loc[["count", "mean", "std"]].round(2).to_string())
+    for col, bad in {**unknown, **({"video_q2": nrs_unknown} if nrs_unknown else {})}.items():
+        print(f"unknown in {col}: {bad}")
@@ -0,0 +1,276 @@
+# export.py
+"""
+Streaming cohort export: every record of one kind (consent | survey | agreement |
+profile) of the whole study, in one pass over data/ (or the SQLite database with
+MENTALYTICS_STORE=sqlite), to a file or stdout.
+
+    python export.py survey -o surveys.ndjson.gz                   # NDJSON, gzip by extension
+    python export.py survey --format csv --compress zstd -o surveys.csv.zst
+    python export.py consent --format parquet -o consent.parquet
+    python export.py survey --from 2025-09-20 --to 2025-09-21 --lang de --lang fr
+    python export.py survey --run-id 1f3a… --canonical | jq .       # stdout
+    python export.py survey --dedup latest -o surveys.csv           # repeated submissions once
+
+Records are read one line at a time and written straight out (Parquet in row
+groups of BATCH_ROWS), so memory stays flat however many participants there are.
+
+- ndjson: the stored records as they are, plus device_id / source / line.
+- csv, parquet: one typed row per record with the columns of study_store.py
+  (big5 flattened, unknown fields in `extra`); these two need pyarrow.
+- --compress gzip | zstd wraps NDJSON/CSV (zstd needs `pip install zstandard`);
+  for Parquet it is the column codec.
+- --canonical maps German/French answers to English first (records.canonical);
+  surveys and profiles only.
+- --dedup first | latest keeps one record per device and distinct answer set (the
+  JSONL hash sidecars of storage.py; hashed on the fly for SQLite). It picks among
+  all of a device's records, before the other filters.
+
+    import export
+    with open("s.csv.gz", "wb") as f:
+        export.export(f, "survey", fmt="csv", compress="gzip", langs=["de"])
+"""
+
+import io
+import os
+import sys
+import csv
+import gzip
+import json
+import datetime
+import argparse
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+
+import records
+import storage
+import study_store
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except Exception:
+    ZSTD_AVAILABLE = False
+
+FORMATS = ("ndjson", "csv", "parquet")
+COMPRESSIONS = ("none", "gzip", "zstd")
+BATCH_ROWS = 4096   # Parquet row group / rows held in memory at once
+CANONICAL_KINDS = ("survey", "profile")
+
+_CANONICAL_SOURCE = {"survey": "survey.jsonl", "profile": "profile.json"}   # records.canonical(source=)
+
+_EXTENSIONS = {".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv", ".parquet": "parquet",
+               ".gz": "gzip", ".zst": "zstd"}
+
+
+# -----------------
+#  READING
+# -----------------
+def _device_records(kind: str, data_dir: str, dedup: str = "all") -> Iterator[Dict[str, Any]]:
+    for path in storage.source_files(kind, data_dir):
+        device = os.path.basename(os.path.dirname(path))
+        source = "json" if path.endswith(".json") else "jsonl"
+        for i, rec in storage.iter_numbered(path, dedup):
+            yield {**rec, "device_id": device, "source": source, "line": i}
+
+def _sqlite_records(kind: str, since: str, dedup: str = "all") -> Iterator[Dict[str, Any]]:
+    """`since` narrows the query only without dedup, which picks among all rows as on JSONL."""
+    import sqlite_store
+    store = sqlite_store.SqliteStore()
+    keep = None
+    if dedup != "all":   # first pass: which row stands for each (device, answers)
+        since = ""       # iter_records() drops the earlier ones afterwards
+        chosen: Dict[Tuple[str, str], int] = {}
+        for i, rec in enumerate(store.export(kind, since)):
+            key = (rec["device_id"], storage.content_hash(rec))
+            if dedup == "latest" or key not in chosen:
+                chosen[key] = i
+        keep = set(chosen.values())
+    for i, rec in enumerate(store.export(kind, since)):
+        if keep is None or i in keep:
+            yield {**rec, "source": "sqlite"}
+
+def _parse_bound(value: str, end: bool = False) -> Optional[datetime.datetime]:
+    """
+    '2025-09-21' or '2025-09-21T16:00'. Upper bounds are returned exclusive, so a
+    bare date as upper bound means the whole day.
+    """
+    if not value:
+        return None
+    ts = datetime.datetime.fromisoformat(value)
+    if end:
+        ts += datetime.timedelta(days=1) if len(value) <= 10 else datetime.timedelta(microseconds=1)
+    return ts
+
+def iter_records(kind: str, data_dir: str = "", since: str = "", until: str = "",
+                 langs: Optional[List[str]] = None, run_ids: Optional[List[str]] = None,
+                 canonical: bool = False, backend: str = "", dedup: str = "all") -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield the records of one kind that pass the filters: timestamp in
+    [since, until] (records without a timestamp are dropped once a bound is set),
+    lang in `langs`, run_id in `run_ids`; dedup as in storage.iter_numbered().
+    canonical=True is for surveys and profiles only.
+    """
+    if dedup not in storage.DEDUP_MODES:
+        raise ValueError(f"dedup must be one of {storage.DEDUP_MODES}, got {dedup!r}")
+    if canonical and kind not in CANONICAL_KINDS:
+        raise ValueError(f"canonical answers exist for {CANONICAL_KINDS} only, not {kind!r}")
+    lo, hi = _parse_bound(since), _parse_bound(until, end=True)
+    lang_set, run_set = set(langs or ()), set(run_ids or ())
+    if (backend or storage.STORE_BACKEND) == "sqlite":
+        source = _sqlite_records(kind, lo.isoformat() if lo else "", dedup)
+    else:
+        source = _device_records(kind, data_dir, dedup)
+    for rec in source:
+        if lo or hi:
+            ts = study_store._to_ts(rec.get("timestamp"))
+            if ts is None or (lo and ts < lo) or (hi and ts >= hi):
+                continue
+        if lang_set and rec.get("lang") not in lang_set:
+            continue
+        if run_set and rec.get("run_id") not in run_set:
+            continue
+        yield records.canonical(rec, _CANONICAL_SOURCE[kind]) if canonical else rec
+
+
+# -----------------
+#  WRITING
+# -----------------
+class _Sink:
+    """Binary output with optional gzip/zstd around it; close() leaves `raw` open."""
+
+    def __init__(self, raw, compress: str):
+        self._raw, self._closer = raw, None
+        if compress == "gzip":
+            self.stream = gzip.GzipFile(fileobj=raw, mode="wb")
+            self._closer = self.stream.close
+        elif compress == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstd compression needs zstandard: pip install zstandard")
+            self.stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+            self._closer = self.stream.close
+        else:
+            self.stream = raw
+
+    def close(self):
+        if self._closer:
+            self._closer()
+        self._raw.flush()
+
+
+def _flat_rows(kind: str, recs: Iterator[Dict[str, Any]], schema) -> Iterator[Dict[str, Any]]:
+    for rec in recs:
+        row = study_store.flatten(kind, {k: v for k, v in rec.items() if k not in ("source", "line")}, schema)
+        row.update(device_id=rec.get("device_id"), source=rec.get("source"), line=rec.get("line"))
+        yield row
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "; ".join(value)
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+def _write_ndjson(out, recs: Iterator[Dict[str, Any]]) -> int:
+    n = 0
+    for rec in recs:
+        out.write(json.dumps(rec, ensure_ascii=False).encode("utf-8") + b"\n")
+        n += 1
+    return n
+
+def _write_csv(out, kind: str, recs: Iterator[Dict[str, Any]]) -> int:
+    schema = study_store._schemas()[kind]
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    w = csv.writer(text)
+    w.writerow(schema.names)
+    n = 0
+    for row in _flat_rows(kind, recs, schema):
+        w.writerow([_csv_value(row.get(c)) for c in schema.names])
+        n += 1
+    text.detach()   # hand `out` back without closing it
+    return n
+
+def _write_parquet(out, kind: str, recs: Iterator[Dict[str, Any]], compress: Optional[str]) -> int:
+    schema = study_store._schemas()[kind]
+    codec = compress or "snappy"
+    n, batch = 0, []
+    with study_store.pq.ParquetWriter(out, schema, compression=codec) as writer:
+        for row in _flat_rows(kind, recs, schema):
+            batch.append(row)
+            if len(batch) >= BATCH_ROWS:
+                writer.write_table(study_store.pa.Table.from_pylist(batch, schema=schema))
+                n, batch = n + len(batch), []
+        if batch or not n:
+            writer.write_table(study_store.pa.Table.from_pylist(batch, schema=schema))
+            n += len(batch)
+    return n
+
+def export(out, kind: str, fmt: str = "ndjson", compress: Optional[str] = None, **filters) -> int:
+    """
+    Stream the records of `kind` into the binary file object `out`; returns the count.
+    compress=None: uncompressed NDJSON/CSV, snappy for Parquet.
+    """
+    if kind not in study_store.KINDS:
+        raise ValueError(f"kind must be one of {study_store.KINDS}, got {kind!r}")
+    if fmt not in FORMATS or compress not in (None,) + COMPRESSIONS:
+        raise ValueError(f"format must be one of {FORMATS}, compress one of {COMPRESSIONS}")
+    if fmt != "ndjson" and not study_store.PYARROW_AVAILABLE:
+        raise RuntimeError(f"{fmt} export needs pyarrow: pip install pyarrow")
+    recs = iter_records(kind, **filters)
+    if fmt == "parquet":
+        return _write_parquet(out, kind, recs, compress)
+    sink = _Sink(out, compress)
+    try:
+        if fmt == "csv":
+            return _write_csv(sink.stream, kind, recs)
+        return _write_ndjson(sink.stream, recs)
+    finally:
+        sink.close()
+
+def guess_format(path: str) -> Tuple[Optional[str], Optional[str]]:
+    """('csv', 'gzip') for 'x.csv.gz'; None where the file name doesn't say."""
+    stem, ext = os.path.splitext(path)
+    compress = _EXTENSIONS.get(ext) if ext in (".gz", ".zst") else None
+    if compress:
+        stem, ext = os.path.splitext(stem)
+    fmt = _EXTENSIONS.get(ext)
+    return (fmt if fmt in FORMATS else None), compress
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Stream the records of the whole study to one file.")
+    ap.add_argument("kind", choices=study_store.KINDS)
+    ap.add_argument("-o", "--out", default="-", help="output file, '-' = stdout (default)")
+    ap.add_argument("--format", choices=FORMATS, help="default: from the file name, else ndjson")
+    ap.add_argument("--compress", choices=COMPRESSIONS, help="default: from the file name, else none")
+    ap.add_argument("--data", default=storage.DATA_DIR)
+    ap.add_argument("--from", dest="since", default="", metavar="DATE", help="e.g. 2025-09-20 or 2025-09-20T14:00")
+    ap.add_argument("--to", dest="until", default="", metavar="DATE", help="inclusive; a bare date = the whole day")
+    ap.add_argument("--lang", action="append", default=[], help="repeatable")
+    ap.add_argument("--run-id", action="append", default=[], help="repeatable")
+    ap.add_argument("--canonical", action="store_true", help="answers in English")
+    ap.add_argument("--dedup", choices=storage.DEDUP_MODES, default="all",
+                    help="repeated submissions: keep all (default), the first or the latest")
+    args = ap.parse_args()
+    if args.canonical and args.kind not in CANONICAL_KINDS:
+        ap.error(f"--canonical works for {' and '.join(CANONICAL_KINDS)} only")
+
+    fmt, compress = guess_format(args.out) if args.out != "-" else (None, None)
+    fmt, compress = args.format or fmt or "ndjson", args.compress or compress
+    filters = dict(data_dir=args.data, since=args.since, until=args.until, langs=args.lang,
+                   run_ids=args.run_id, canonical=args.canonical, dedup=args.dedup)
+    if compress == "zstd" and not ZSTD_AVAILABLE and fmt != "parquet":
+        sys.exit("zstd compression needs zstandard: pip install zstandard")
+    try:
+        if args.out == "-":
+            n = export(sys.stdout.buffer, args.kind, fmt, compress, **filters)
+        else:
+            with open(args.out, "wb") as f:
+                n = export(f, args.kind, fmt, compress, **filters)
+    except BrokenPipeError:   # `… | head`: the reader is gone, that's fine
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(0)
+    except RuntimeError as e:
+        sys.exit(str(e))
+    print(f"{n} {args.kind} records -> {args.out} ({fmt}, {compress or 'default'})", file=sys.stderr)
+    sys.exit(0)
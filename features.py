@@ -0,0 +1,279 @@
+# features.py
+"""
+Survey -> fixed-width numeric feature vector (the AMM model input).
+
+Works on canonical survey answers (records.canonical / records.iter_surveys), so a
+record in any UI language or from any pilot generation gives the same vector:
+
+    numeric     age, overall_health, mobility, video_q1 (expected difficulty)
+    big5_*      the 10 Big Five items as 1..7
+    <field>=<option>   one-hot for every categorical answer, multi-hot for activities
+
+Missing / unknown numeric answers are NaN (the model imputes them), one-hot columns
+are 0. The targets (video_q2, pt_adherence) are never part of the features.
+
+Vectors are computed once per survey run and kept in features/ (FeatureStore): a raw
+float32 file that np.memmap opens as the whole (N × F) study matrix, without touching
+any JSON.
+
+    python features.py          # vectorize surveys not cached yet, print the matrix shape
+"""
+
+import os
+import sys
+import hashlib
+import threading
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+import numpy as np
+
+import i18n
+import records
+import storage
+
+NUMERIC = ("age", "overall_health", "mobility", "video_q1")
+CATEGORICAL = (
+    "gender_bio", "marital", "disability", "sleep_hours", "sleep_problem", "employment",
+    "industry", "work_type", "emotional", "stress", "days_per_week", "session_length",
+    "mood_link", "surgery", "recovery", "pt_after",
+)
+MULTI = ("activities",)
+
+
+def _options(field_name: str) -> List[str]:
+    return list(i18n.catalog(i18n.FALLBACK_LANG)[records.OPTION_KEYS[field_name]])
+
+def _names() -> List[str]:
+    names = list(NUMERIC) + [f"big5_{k}" for k in records.BIG5_KEYS]
+    for f in CATEGORICAL + MULTI:
+        names += [f"{f}={o}" for o in _options(f)]
+    return names
+
+FEATURE_NAMES = tuple(_names())
+N_FEATURES = len(FEATURE_NAMES)
+# Identifies the layout: models and cached vectors built for another layout are ignored
+LAYOUT = hashlib.sha1("\n".join(FEATURE_NAMES).encode("utf-8")).hexdigest()[:12]
+
+_INDEX = {name: i for i, name in enumerate(FEATURE_NAMES)}
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def vectorize(data: Dict[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Canonical answers -> float32 vector of N_FEATURES."""
+    if out is None:
+        out = np.zeros(N_FEATURES, dtype=np.float32)
+    else:
+        out[:] = 0
+    for i, name in enumerate(NUMERIC):
+        out[i] = _number(data.get(name))
+    big5 = data.get("big5") or {}
+    for i, k in enumerate(records.BIG5_KEYS, start=len(NUMERIC)):
+        n = records.likert_num(big5[k]) if k in big5 else None
+        out[i] = np.nan if n is None else n
+    for f in CATEGORICAL + MULTI:
+        value = data.get(f)
+        for v in (value if isinstance(value, list) else [value]):
+            j = _INDEX.get(f"{f}={v}")
+            if j is not None:
+                out[j] = 1.0
+    return out
+
+def matrix(datas: Iterable[Dict[str, Any]]) -> np.ndarray:
+    """Many canonical records -> (N, N_FEATURES) float32."""
+    datas = list(datas)
+    X = np.zeros((len(datas), N_FEATURES), dtype=np.float32)
+    for row, data in zip(X, datas):
+        vectorize(data, row)
+    return X
+
+
+def run_key(data: Dict[str, Any]) -> str:
+    """Cache key of a survey within its device: run_id, or the timestamp for pilot records."""
+    return data.get("run_id") or f"legacy-{data.get('timestamp') or ''}"
+
+
+# -----------------
+#  FEATURE CACHE
+# -----------------
+FEATURE_DIR = os.environ.get("MENTALYTICS_FEATURES", "features")
+_ROW_BYTES = N_FEATURES * 4
+
+class FeatureStore:
+    """
+    One float32 row per (device_id, run_key), append-only, for the current LAYOUT:
+
+        features/<LAYOUT>.f32    raw rows, N × N_FEATURES little-endian float32
+        features/<LAYOUT>.keys   "device_id<TAB>run_key" per row, same order
+
+    Rows are written before their key line, so a reader only trusts the first
+    min(rows, keys) of them. Leftovers of an interrupted write (rows without a key,
+    a half-written key line) are cut off under the lock before the next append, or
+    by load() when the two files disagree. Shared by threads and processes
+    (storage.device_lock).
+    """
+
+    def __init__(self, store_dir: str = FEATURE_DIR):
+        self.store_dir = store_dir
+        self.vec_path = os.path.join(store_dir, f"{LAYOUT}.f32")
+        self.key_path = os.path.join(store_dir, f"{LAYOUT}.keys")
+        self._rows: Dict[Tuple[str, str], int] = {}
+        self._keys: List[Tuple[str, str]] = []
+        self._key_ends: List[int] = []   # byte offset after each key line
+        self._keys_read = 0          # bytes of .keys consumed
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """Pick up key lines appended since the last call (by any process)."""
+        if not os.path.isfile(self.key_path):
+            return
+        with open(self.key_path, "rb") as f:
+            f.seek(self._keys_read)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._keys_read += len(line)
+                key = tuple(line.decode("utf-8").rstrip("\n").split("\t", 1))
+                self._rows.setdefault(key, len(self._keys))
+                self._keys.append(key)
+                self._key_ends.append(self._keys_read)
+
+    def _sizes(self) -> Tuple[int, int]:
+        vec = os.path.getsize(self.vec_path) if os.path.isfile(self.vec_path) else 0
+        keys = os.path.getsize(self.key_path) if os.path.isfile(self.key_path) else 0
+        return vec, keys
+
+    def _n_rows(self) -> int:
+        return min(self._sizes()[0] // _ROW_BYTES, len(self._keys))
+
+    def _consistent(self) -> bool:
+        return self._sizes() == (len(self._keys) * _ROW_BYTES, self._keys_read)
+
+    def _repair(self):
+        """Cut both files back to their last complete row + key (under the device lock)."""
+        self._refresh()
+        n = self._n_rows()
+        key_end = self._key_ends[n - 1] if n else 0
+        vec_size, key_size = self._sizes()
+        if key_size != key_end:
+            os.truncate(self.key_path, key_end)
+        if vec_size != n * _ROW_BYTES:
+            os.truncate(self.vec_path, n * _ROW_BYTES)
+        if n < len(self._keys):
+            del self._keys[n:], self._key_ends[n:]
+            self._keys_read = key_end
+            self._rows = {}
+            for i, key in enumerate(self._keys):
+                self._rows.setdefault(key, i)
+
+    # ---- single vectors ----
+    def get(self, device_id: str, run: str) -> Optional[np.ndarray]:
+        key = (device_id, run)
+        with self._lock:
+            if key not in self._rows:
+                self._refresh()
+            row = self._rows.get(key)
+            if row is None or row >= self._n_rows():
+                return None
+        return np.fromfile(self.vec_path, dtype="<f4", count=N_FEATURES, offset=row * _ROW_BYTES)
+
+    def vector(self, device_id: str, data: Dict[str, Any]) -> np.ndarray:
+        """Cached vector of a survey, computed and stored on first use."""
+        x = self.get(device_id, run_key(data))
+        if x is None:
+            x = vectorize(data)
+            self.put([((device_id, run_key(data)), x)])
+        return x
+
+    def put(self, items: List[Tuple[Tuple[str, str], np.ndarray]]) -> int:
+        """Append vectors whose key isn't stored yet; returns how many were added."""
+        os.makedirs(self.store_dir, exist_ok=True)
+        with self._lock, storage.device_lock(self.key_path):
+            self._repair()
+            new, seen = [], set()
+            for key, x in items:
+                if key not in self._rows and key not in seen:
+                    seen.add(key)
+                    new.append((key, x))
+            if not new:
+                return 0
+            with open(self.vec_path, "ab") as f:
+                f.write(np.stack([x for _, x in new]).astype("<f4", copy=False).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.key_path, "ab") as f:
+                f.write("".join(f"{d}\t{r}\n" for (d, r), _ in new).encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            self._refresh()
+            return len(new)
+
+    def vectors(self, items: List[Tuple[str, Dict[str, Any]]]) -> np.ndarray:
+        """Batch vector(): (device_id, canonical answers) pairs -> (N, N_FEATURES)."""
+        keys = [(device_id, run_key(data)) for device_id, data in items]
+        with self._lock:
+            self._refresh()
+            missing = [(k, data) for k, (_, data) in zip(keys, items) if k not in self._rows]
+        if missing:
+            self.put([(k, vectorize(data)) for k, data in missing])
+        _, X = self.load()
+        if not keys:
+            return np.zeros((0, N_FEATURES), dtype=np.float32)
+        return np.asarray(X[[self._rows[k] for k in keys]])
+
+    # ---- whole study ----
+    def sync(self, data_dir: str = "") -> int:
+        """Vectorize every survey of data/ that has no cached row yet."""
+        with self._lock:
+            self._refresh()
+            known = set(self._rows)
+        todo = [(rec.device_id, rec.data) for rec in records.iter_surveys(data_dir, valid_only=True)
+                if (rec.device_id, run_key(rec.data)) not in known]
+        return self.put([((d, run_key(data)), vectorize(data)) for d, data in todo])
+
+    def load(self) -> Tuple[List[Tuple[str, str]], np.ndarray]:
+        """(keys, X): every cached row as a read-only (N × N_FEATURES) memmap."""
+        with self._lock:
+            self._refresh()
+            if not self._consistent():   # a write in progress, or one that was interrupted
+                with storage.device_lock(self.key_path):
+                    self._repair()
+            n = self._n_rows()
+            keys = self._keys[:n]
+        if not n:
+            return keys, np.zeros((0, N_FEATURES), dtype=np.float32)
+        return keys, np.memmap(self.vec_path, dtype="<f4", mode="r", shape=(n, N_FEATURES))
+
+
+_store: Optional[FeatureStore] = None
+_store_lock = threading.Lock()
+
+def feature_store() -> FeatureStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FeatureStore()
+        return _store
+
+def load_matrix(sync: bool = False, data_dir: str = "") -> Tuple[List[Tuple[str, str]], np.ndarray]:
+    """The whole study as (keys, N × F matrix); sync=True first vectorizes new surveys."""
+    store = feature_store()
+    if sync:
+        store.sync(data_dir)
+    return store.load()
+
+
+if __name__ == "__main__":
+    import time
+    t0 = time.perf_counter()
+    added = feature_store().sync(sys.argv[1] if len(sys.argv) > 1 else "")
+    t1 = time.perf_counter()
+    keys, X = load_matrix()
+    t2 = time.perf_counter()
+    print(f"{added} new vectors in {(t1 - t0) * 1000:.0f} ms; "
+          f"matrix {X.shape[0]} × {X.shape[1]} loaded in {(t2 - t1) * 1000:.1f} ms "
+          f"({feature_store().vec_path})")
@@ -0,0 +1,186 @@
+# ids.py
+"""
+Device and run identifiers: ULIDs – 26 Crockford base32 characters, a 48-bit
+millisecond timestamp followed by 80 random bits.
+
+    01JA7ZQ4V3M8N6K2P5R9T1W3XY
+    |--------||--------------|
+     time (ms)     random
+
+- Collision-free in practice across booths and worker processes (80 random bits
+  per millisecond; the 6-hex-digit device ids of the first pilots had 24 bits).
+- Sorting the strings sorts by creation time, so "latest" and "since" are plain
+  string comparisons / index range scans. Within one process, ids made in the same
+  millisecond still increase (monotonic ULIDs).
+
+Older ids stay valid and are never renamed: the 6-character device folders are in
+participants' bookmarked ?device= links, and run_ids like 20250921-155950 are in the
+records. sort_key() places those run_ids among the new ones by their time.
+
+    python ids.py                    # a new id and its time
+    python ids.py migrate            # report legacy run_ids in data/ (dry run)
+    python ids.py migrate --apply    # rewrite them as ULIDs (original kept in legacy_run_id)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import secrets
+import datetime
+import argparse
+import threading
+from typing import Optional, Dict
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"   # Crockford: no I, L, O, U
+LENGTH = 26
+_RANDOM_BITS = 80
+
+ULID_RE = re.compile(r"^[0-7][0-9A-HJKMNP-TV-Z]{25}$")
+LEGACY_RUN_RE = re.compile(r"^\d{8}-\d{6}$")
+DEVICE_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")   # anything else can't be a folder under data/
+
+_lock = threading.Lock()
+_last_ms, _last_rand = -1, 0
+
+
+# -----------------
+#  ENCODING
+# -----------------
+def _encode(value: int) -> str:
+    out = []
+    for _ in range(LENGTH):
+        value, r = divmod(value, 32)
+        out.append(ALPHABET[r])
+    return "".join(reversed(out))
+
+def _decode(s: str) -> int:
+    value = 0
+    for ch in s.upper():
+        value = value * 32 + ALPHABET.index(ch)
+    return value
+
+def from_time(ms: int, rand: int = 0) -> str:
+    return _encode((ms << _RANDOM_BITS) | (rand & ((1 << _RANDOM_BITS) - 1)))
+
+
+# -----------------
+#  NEW IDS
+# -----------------
+def new_id() -> str:
+    """A fresh ULID; ids from one process are strictly increasing."""
+    global _last_ms, _last_rand
+    ms = time.time_ns() // 1_000_000
+    with _lock:
+        if ms <= _last_ms:
+            ms, rand = _last_ms, _last_rand + 1   # same ms (or clock stepped back): count up
+            if rand >> _RANDOM_BITS:
+                ms, rand = ms + 1, secrets.randbits(_RANDOM_BITS)
+        else:
+            rand = secrets.randbits(_RANDOM_BITS)
+        _last_ms, _last_rand = ms, rand
+    return from_time(ms, rand)
+
+def is_ulid(s: str) -> bool:
+    return bool(ULID_RE.match(s or ""))
+
+def valid_device(s: str) -> bool:
+    """A device id the app accepts from ?device=: a ULID, a pilot id, or any safe folder name."""
+    return bool(DEVICE_RE.match(s or ""))
+
+
+# -----------------
+#  TIME / ORDER
+# -----------------
+def _legacy_ms(run_id: str) -> int:
+    """20250921-155950 was local time of the laptop."""
+    return int(datetime.datetime.strptime(run_id, "%Y%m%d-%H%M%S").timestamp() * 1000)
+
+def id_time(s: str) -> Optional[datetime.datetime]:
+    """When an id was made (local time), None if it doesn't carry a time."""
+    if is_ulid(s):
+        return datetime.datetime.fromtimestamp((_decode(s) >> _RANDOM_BITS) / 1000)
+    if LEGACY_RUN_RE.match(s or ""):
+        return datetime.datetime.strptime(s, "%Y%m%d-%H%M%S")
+    return None
+
+def sort_key(run_id: str) -> str:
+    """
+    Comparable key for old and new run_ids: a ULID is its own key, a legacy
+    YYYYmmdd-HHMMSS id becomes the smallest ULID of that second.
+    """
+    if LEGACY_RUN_RE.match(run_id or ""):
+        return from_time(_legacy_ms(run_id))
+    return run_id or ""
+
+
+# -----------------
+#  MIGRATION
+# -----------------
+def migrated_run_id(run_id: str, device_id: str, line: int) -> str:
+    """
+    The ULID a legacy run_id is rewritten to: its time, plus random bits derived from
+    (device, record number), so running the migration twice gives the same ids.
+    """
+    seed = hashlib.sha256(f"{device_id}/{line}/{run_id}".encode("utf-8")).digest()
+    return from_time(_legacy_ms(run_id), int.from_bytes(seed[:10], "big"))
+
+def migrate(data_dir: str = "", apply: bool = False) -> Dict[str, int]:
+    """
+    Rewrite legacy run_ids of data/*/*.jsonl as ULIDs (the old value is kept in
+    `legacy_run_id`). Device folders are left as they are. Returns counts per kind.
+    """
+    import storage   # storage imports this module
+
+    counts: Dict[str, int] = {}
+    data_dir = data_dir or storage.DATA_DIR
+    for device in storage.device_ids(data_dir):
+        folder = os.path.join(data_dir, device)
+        for fn in sorted(os.listdir(folder)):
+            if not fn.endswith(".jsonl"):
+                continue
+            path = os.path.join(folder, fn)
+            with storage.device_lock(path):
+                recs = list(storage.iter_source(path, resolve=False))
+                changed = 0
+                for i, rec in enumerate(recs):
+                    rid = rec.get("run_id")
+                    if isinstance(rid, str) and LEGACY_RUN_RE.match(rid):
+                        rec["legacy_run_id"], rec["run_id"] = rid, migrated_run_id(rid, device, i)
+                        changed += 1
+                if changed and apply:
+                    tmp = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp, "wb") as f:
+                        f.writelines((json.dumps(r, ensure_ascii=False) + "\n").encode("utf-8") for r in recs)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp, path)
+                    for sidecar in (storage._index_path(path), storage._key_path(path)):
+                        if os.path.exists(sidecar):
+                            os.remove(sidecar)   # rebuilt on the next read
+            if changed:
+                counts[fn[:-len(".jsonl")]] = counts.get(fn[:-len(".jsonl")], 0) + changed
+    if storage.STORE_BACKEND == "sqlite":
+        for kind, n in storage.get_store().rewrite_run_ids(migrated_run_id, LEGACY_RUN_RE, apply).items():
+            counts[f"sqlite:{kind}"] = n
+    return counts
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="ULID device/run ids; migrate legacy run_ids.")
+    ap.add_argument("command", nargs="?", choices=["new", "migrate"], default="new")
+    ap.add_argument("--data", default="")
+    ap.add_argument("--apply", action="store_true", help="rewrite the files (default: dry run)")
+    args = ap.parse_args()
+    if args.command == "new":
+        i = new_id()
+        print(i, id_time(i).isoformat(timespec="milliseconds"))
+    else:
+        counts = migrate(args.data, apply=args.apply)
+        verb = "rewrote" if args.apply else "would rewrite"
+        print(f"{verb} legacy run_ids: {counts or 'none'}")
+        if counts and args.apply:
+            print("files were rewritten, not appended: run `python study_store.py --rebuild`")
+    sys.exit(0)
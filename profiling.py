@@ -0,0 +1,257 @@
+# profiling.py
+"""
+Where does a rerun spend its time? Timing spans for the page functions and the hot
+helpers (CSS injection, asset URLs, string lookups, store reads/appends, chart specs).
+
+Spans are collected per rerun (one trace per script run, thread-local, so sessions
+don't mix). Nothing is recorded unless asked for:
+
+    MENTALYTICS_TRACE=traces/spans.jsonl streamlit run app.py    # every rerun -> JSONL
+    http://localhost:8501/?profile=1                             # breakdown under the page
+
+Each line of the JSONL file is one span with OpenTelemetry (OTLP/JSON) field names –
+traceId, spanId, parentSpanId, name, start/endTimeUnixNano, attributes – so it can be
+replayed into an OTel collector. Helpers called many times per rerun (t(), qs(), …) are
+recorded as one aggregated span with a `calls` attribute instead of one span per call.
+
+    python profiling.py                    # per-span count / p50 / p95 / p99 / max
+    python profiling.py --name page_       # + latency histograms of the matching spans
+"""
+
+import os
+import sys
+import json
+import time
+import secrets
+import argparse
+import threading
+import functools
+import contextlib
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Iterator
+
+TRACE_PATH = os.environ.get("MENTALYTICS_TRACE", "")
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+@dataclass
+class Span:
+    name: str
+    span_id: str
+    parent_id: str
+    start_ns: int
+    end_ns: int = 0
+    calls: int = 1
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+class Trace:
+    """The spans of one rerun; the first one is the root."""
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List[Span] = []
+        self._stack: List[Span] = []
+        self._aggregates: Dict[str, Span] = {}
+        self.root = self.open(name, attrs)
+
+    def open(self, name: str, attrs: Dict[str, Any]) -> Span:
+        parent = self._stack[-1].span_id if self._stack else ""
+        s = Span(name, secrets.token_hex(8), parent, time.time_ns(), attrs=dict(attrs))
+        self.spans.append(s)
+        self._stack.append(s)
+        return s
+
+    def close(self, s: Span):
+        s.end_ns = time.time_ns()
+        if s in self._stack:
+            del self._stack[self._stack.index(s):]
+
+    def add(self, name: str, duration_ns: int):
+        """One more call of an aggregated helper (a single span under the root)."""
+        s = self._aggregates.get(name)
+        if s is None:
+            now = time.time_ns()
+            s = Span(name, secrets.token_hex(8), self.root.span_id, now - duration_ns, now, calls=0)
+            self.spans.append(s)
+            self._aggregates[name] = s
+        else:
+            s.end_ns += duration_ns   # the span's length is the summed time of all calls
+        s.calls += 1
+
+
+# -----------------
+#  RECORDING
+# -----------------
+def start(name: str = "rerun", **attrs) -> Trace:
+    """Begin the trace of this thread's rerun (replaces an unfinished one)."""
+    _local.trace = Trace(name, attrs)
+    return _local.trace
+
+def current() -> Optional[Trace]:
+    return getattr(_local, "trace", None)
+
+def finish() -> Optional[Trace]:
+    """Close the current trace and append it to TRACE_PATH (if set)."""
+    trace = current()
+    if trace is None:
+        return None
+    _local.trace = None
+    for s in trace.spans:
+        if not s.end_ns:
+            s.end_ns = time.time_ns()
+    if TRACE_PATH:
+        write(trace, TRACE_PATH)
+    return trace
+
+@contextlib.contextmanager
+def span(name: str, **attrs) -> Iterator[None]:
+    trace = current()
+    if trace is not None:
+        s = trace.open(name, attrs)
+        try:
+            yield
+        finally:
+            trace.close(s)
+    elif TRACE_PATH:
+        # outside a traced rerun (fragment rerun, worker thread): a trace of its own
+        start(name, **attrs)
+        try:
+            yield
+        finally:
+            finish()
+    else:
+        yield
+
+def traced(name: str = "", aggregate: bool = False):
+    """Decorator: time every call as a span (or, aggregate=True, summed per rerun)."""
+    def deco(fn):
+        label = name or fn.__name__
+
+        if aggregate:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                trace = current()
+                if trace is None:
+                    return fn(*args, **kwargs)
+                t0 = time.perf_counter_ns()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    trace.add(label, time.perf_counter_ns() - t0)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with span(label):
+                    return fn(*args, **kwargs)
+        wrapper._traced = True
+        return wrapper
+    return deco
+
+def instrument(obj: Any, methods: List[str], prefix: str) -> Any:
+    """Trace some methods of an object (idempotent, the app re-runs this every rerun)."""
+    for m in methods:
+        fn = getattr(obj, m)
+        if not getattr(fn, "_traced", False):
+            setattr(obj, m, traced(f"{prefix}.{m}")(fn))
+    return obj
+
+
+# -----------------
+#  OUTPUT
+# -----------------
+def _otlp_value(v: Any) -> Dict[str, Any]:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": v}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+def to_otlp(trace: Trace, s: Span) -> Dict[str, Any]:
+    attrs = {**s.attrs, "calls": s.calls} if s.calls != 1 else s.attrs
+    return {
+        "traceId": trace.trace_id, "spanId": s.span_id, "parentSpanId": s.parent_id,
+        "name": s.name, "startTimeUnixNano": s.start_ns, "endTimeUnixNano": s.end_ns,
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attrs.items()],
+    }
+
+def write(trace: Trace, path: str):
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    lines = "".join(json.dumps(to_otlp(trace, s)) + "\n" for s in trace.spans)
+    with _write_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(lines)   # one write per rerun: lines of concurrent sessions don't interleave
+
+def breakdown(trace: Trace) -> List[Dict[str, Any]]:
+    """Rows for the ?profile=1 overlay: span tree in call order, time and share of the rerun."""
+    children: Dict[str, List[Span]] = {}
+    for s in trace.spans:
+        children.setdefault(s.parent_id, []).append(s)
+    total = trace.root.ms or 1.0
+    rows = []
+
+    def walk(s: Span, depth: int):
+        rows.append({"span": "  " * depth + s.name, "ms": round(s.ms, 2), "calls": s.calls,
+                     "share": f"{s.ms / total:.0%}"})
+        for c in children.get(s.span_id, []):
+            walk(c, depth + 1)
+    walk(trace.root, 0)
+    return rows
+
+
+# -----------------
+#  CLI: histograms
+# -----------------
+_BUCKETS_MS = (0.1, 0.3, 1, 3, 10, 30, 100, 300, 1000, 3000)
+
+def read_spans(path: str) -> Dict[str, List[float]]:
+    """span name -> durations in ms, from a JSONL trace file."""
+    out: Dict[str, List[float]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                s = json.loads(line)
+            except ValueError:
+                continue
+            out.setdefault(s["name"], []).append((s["endTimeUnixNano"] - s["startTimeUnixNano"]) / 1e6)
+    return out
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    i = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[i]
+
+def histogram(values: List[float], width: int = 40) -> List[str]:
+    counts = [0] * (len(_BUCKETS_MS) + 1)
+    for v in values:
+        counts[next((i for i, b in enumerate(_BUCKETS_MS) if v < b), len(_BUCKETS_MS))] += 1
+    top = max(counts) or 1
+    labels = [f"< {b:g} ms" for b in _BUCKETS_MS] + [f">= {_BUCKETS_MS[-1]:g} ms"]
+    return [f"  {label:>11s} {'#' * round(width * c / top):{width}s} {c}"
+            for label, c in zip(labels, counts) if c]
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Summarize a MENTALYTICS_TRACE span file.")
+    ap.add_argument("path", nargs="?", default=TRACE_PATH or os.path.join("traces", "spans.jsonl"))
+    ap.add_argument("--name", default="", help="show histograms of spans starting with this")
+    args = ap.parse_args()
+
+    spans = read_spans(args.path)
+    print(f"{'span':28s} {'n':>6s} {'mean':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>8s}  (ms)")
+    for name, values in sorted(spans.items(), key=lambda kv: -sum(kv[1])):
+        v = sorted(values)
+        print(f"{name[:28]:28s} {len(v):6d} {sum(v) / len(v):8.2f} {_percentile(v, 50):8.2f} "
+              f"{_percentile(v, 95):8.2f} {_percentile(v, 99):8.2f} {v[-1]:8.2f}")
+    for name in sorted(n for n in spans if args.name and n.startswith(args.name)):
+        print(f"\n{name}")
+        print("\n".join(histogram(spans[name])))
+    sys.exit(0)
@@ -0,0 +1,162 @@
+# questionnaire.py
+"""
+The study questionnaire in one place, for the Streamlit app (app.py) and the offline
+client's endpoint (sync_server.py): sections, questions and their options, the Big
+Five defaults, and the checks a record has to pass before it is stored.
+
+    SECTIONS   [(section title key, [(field, label key, options, widget), …]), …]
+               options: "survey.<key>" | "<top-level key>" | "yes_no" | "scale5" | "ages"
+               widget:  "choice" | "multi"
+
+Fields are the names in the stored survey record. The Big Five items (BIG5_DEFAULTS)
+come before the video section. The app asks for the same things with its own widget
+keys (app.WIDGET_KEYS).
+
+    import questionnaire
+    questionnaire.options("de", "yes_no")                  # ['Ja', 'Nein']
+    questionnaire.problems("survey", record)               # [] if it may be stored
+"""
+
+import datetime
+from typing import List, Dict, Any, Tuple
+
+import i18n
+
+SECTIONS: List[Tuple[str, List[Tuple[str, str, str, str]]]] = [
+    ("sec_demo", [("age", "age", "ages", "choice"),
+                  ("gender_bio", "survey.gender_label", "survey.gender_opts", "choice"),
+                  ("marital", "survey.marital_q", "survey.marital_opts", "choice")]),
+    ("sec_health", [("disability", "survey.disability_q", "yes_no", "choice"),
+                    ("sleep_hours", "survey.sleep_hours_q", "survey.sleep_hours_opts", "choice"),
+                    ("sleep_problem", "survey.sleep_problem_q", "yes_no", "choice")]),
+    ("sec_employment", [("employment", "survey.employment_q", "survey.employment_opts", "choice"),
+                        ("industry", "survey.industry_q", "survey.industry_opts", "choice"),
+                        ("work_type", "survey.work_type_q", "survey.work_type_opts", "choice")]),
+    ("sec_psych", [("emotional", "survey.emotional_q", "survey.emotional_opts", "choice"),
+                   ("stress", "survey.stress_q", "survey.stress_opts", "choice")]),
+    ("sec_lifestyle", [("activities", "survey.activities_q", "survey.activities_opts", "multi"),
+                       ("days_per_week", "survey.days_q", "survey.days_opts", "choice"),
+                       ("session_length", "survey.session_len_q", "survey.session_len_opts", "choice"),
+                       ("mood_link", "survey.mood_link_q", "survey.mood_link_opts", "choice")]),
+    ("sec_status", [("overall_health", "survey.overall_health_q", "scale5", "choice"),
+                    ("mobility", "survey.mobility_q", "scale5", "choice"),
+                    ("surgery", "survey.surgery_q", "yes_no", "choice"),
+                    ("recovery", "survey.recovery_q", "survey.recovery_opts", "choice"),
+                    ("pt_after", "survey.pt_after_q", "yes_no", "choice"),
+                    ("pt_adherence", "survey.pt_adherence_q", "pt_adherence_opts", "choice")]),
+    ("video_exercise", [("video_q1", "survey.video_q", "scale5", "choice"),
+                        ("video_q2", "survey.video_q2", "scale5", "choice")]),
+]
+# field -> (label key, options, widget)
+QUESTIONS = {f: (label, spec, widget) for _, fields in SECTIONS for f, label, spec, widget in fields}
+
+SURGERY_FOLLOWUPS = ("recovery", "pt_after", "pt_adherence")   # only asked after a "yes"
+SPECIFY = ("activities", "industry", "work_type")               # "Other" -> <field>_other text
+VIDEO_FIELDS = ("video_q1", "video_q2")                         # stored as int 1..5
+
+# Big Five item -> default answer index (3 = 'Neutral')
+BIG5_DEFAULTS = {
+    "extrav": 3, "quarrel": 2, "discipline": 4, "anxious": 2, "open": 4,
+    "quiet": 3, "warm": 4, "careless": 2, "stable": 3, "uncreative": 2,
+}
+
+SCALE_1_5 = ["1", "2", "3", "4", "5"]
+AGES = [str(i) for i in range(1, 101)]
+OTHER_TOKENS = ("other", "andere", "autre")
+MAX_TEXT = 500   # characters of a "please specify" answer
+
+
+def is_other(value: Any) -> bool:
+    """An "Other (please specify)" option, in any UI language."""
+    return any(tok in str(value).lower() for tok in OTHER_TOKENS)
+
+def options(lang: str, spec: str) -> List[str]:
+    """The options of a question, in one language."""
+    if spec == "ages":
+        return AGES
+    if spec == "scale5":
+        return SCALE_1_5
+    cat = i18n.catalog(lang)
+    if spec == "yes_no":
+        return cat["survey.yn_opts"][:2]
+    return list(cat[spec])
+
+def operated(survey: Dict[str, Any]) -> bool:
+    return survey.get("surgery") == options(survey.get("lang") or i18n.FALLBACK_LANG, "yes_no")[0]
+
+
+# -----------------
+#  CHECKS
+# -----------------
+def missing_answers(survey: Dict[str, Any]) -> List[str]:
+    """Fields the participant still has to answer (activities, "please specify" texts)."""
+    missing = []
+    if not survey.get("activities"):
+        missing.append("activities")
+    for f in SPECIFY:
+        values = survey.get(f)
+        values = values if isinstance(values, list) else [values]
+        if any(is_other(v) for v in values) and not survey.get(f"{f}_other"):
+            missing.append(f"{f}_other")
+    return missing
+
+SURVEY_KEYS = frozenset(QUESTIONS) | {f"{f}_other" for f in SPECIFY} | {
+    "lang", "device_id", "timestamp", "run_id", "big5"}
+CONSENT_KEYS = frozenset({"agreed_info", "agreed_data", "timestamp", "lang", "run_id"})
+AGREEMENT_KEYS = frozenset({"device_id", "timestamp", "lang", "agree_with_model", "run_id"})
+
+def _timestamp_ok(value: Any) -> bool:
+    try:
+        datetime.datetime.fromisoformat(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+def _survey_problems(rec: Dict[str, Any]) -> List[str]:
+    lang = rec["lang"]
+    out = []
+    for f, (_, spec, widget) in QUESTIONS.items():
+        value, allowed = rec.get(f), options(lang, spec)
+        if f in SURGERY_FOLLOWUPS and not operated(rec):
+            if value is not None:
+                out.append(f"{f}: only asked after surgery")
+        elif f in VIDEO_FIELDS:
+            if not (type(value) is int and str(value) in allowed):
+                out.append(f"{f}: expected 1–5, got {value!r}")
+        elif widget == "multi":
+            if not isinstance(value, list) or any(v not in allowed for v in value) or len(set(value)) != len(value):
+                out.append(f"{f}: unknown value {value!r}")
+        elif value not in allowed:
+            out.append(f"{f}: unknown value {value!r}")
+    for f in SPECIFY:
+        text = rec.get(f"{f}_other", "")
+        if not isinstance(text, str) or len(text) > MAX_TEXT:
+            out.append(f"{f}_other: expected text of at most {MAX_TEXT} characters")
+    big5 = rec.get("big5")
+    likert = i18n.catalog(lang)["likert7"]
+    if not isinstance(big5, dict) or set(big5) != set(BIG5_DEFAULTS):
+        out.append("big5: expected every item once")
+    else:
+        out += [f"big5.{k}: unknown value {v!r}" for k, v in big5.items() if v not in likert]
+    out += [f"{f}: missing" for f in missing_answers(rec)]
+    return out
+
+def problems(kind: str, rec: Dict[str, Any]) -> List[str]:
+    """
+    Why a record (as the app stores it, in its own language) must not be stored;
+    [] if it may. For records that were not made by this app's widgets, e.g. synced
+    from a phone.
+    """
+    keys = {"survey": SURVEY_KEYS, "consent": CONSENT_KEYS, "agreement": AGREEMENT_KEYS}[kind]
+    out = [f"{k}: unknown field" for k in sorted(set(rec) - keys)]
+    if rec.get("lang") not in i18n.LANGUAGES:
+        return out + [f"lang: unknown language {rec.get('lang')!r}"]
+    if not _timestamp_ok(rec.get("timestamp")):
+        out.append(f"timestamp: expected an ISO time, got {rec.get('timestamp')!r}")
+    if kind == "survey":
+        out += _survey_problems(rec)
+    elif kind == "consent":
+        out += [f"{k}: expected true" for k in ("agreed_info", "agreed_data") if rec.get(k) is not True]
+    elif not isinstance(rec.get("agree_with_model"), bool):
+        out.append("agree_with_model: expected true or false")
+    return out
@@ -0,0 +1,279 @@
+# records.py
+"""
+One reader for the three generations of survey data in data/<DEVICE_ID>/:
+
+    survey.jsonl   current app (localized answers, big5 as Likert words, run_id)
+    survey.json    first pilot (pretty-printed, big5 as "1".."7")
+    profile.json   quick-profile prototype (Age/Gender/..._idx fields, mixed EN/DE values)
+
+iter_surveys() streams them as SurveyRecord objects with the same canonical shape:
+the app's survey fields, English option words, big5 as English Likert words.
+Files are parsed once and cached by mtime (appended JSONL is read incrementally,
+unless the file was replaced or its already-read part changed);
+validation only runs when a record's `problems` are looked at.
+
+A participant who went back and saved the same answers again has several identical
+records; iter_surveys(dedup="latest" | "first") keeps one of them per device
+(storage.content_hash of the record as stored, so only exact repeats count).
+"""
+
+import os
+import hashlib
+import datetime
+import threading
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+
+import i18n
+import storage
+
+FALLBACK = i18n.FALLBACK_LANG
+BIG5_KEYS = ("extrav", "quarrel", "discipline", "anxious", "open",
+             "quiet", "warm", "careless", "stable", "uncreative")
+SURVEY_FIELDS = (
+    "lang", "device_id", "timestamp", "run_id", "age", "gender_bio", "marital",
+    "disability", "sleep_hours", "sleep_problem", "employment", "industry", "industry_other",
+    "work_type", "work_type_other", "emotional", "stress", "activities", "activities_other",
+    "days_per_week", "session_length", "mood_link", "overall_health", "mobility", "surgery",
+    "recovery", "pt_after", "pt_adherence", "big5", "video_q1", "video_q2",
+)
+
+# survey field -> catalog key of its options
+OPTION_KEYS = {
+    "gender_bio": "survey.gender_opts", "marital": "survey.marital_opts",
+    "disability": "survey.yn_opts", "sleep_hours": "survey.sleep_hours_opts",
+    "sleep_problem": "survey.yn_opts", "employment": "survey.employment_opts",
+    "industry": "survey.industry_opts", "work_type": "survey.work_type_opts",
+    "emotional": "survey.emotional_opts", "stress": "survey.stress_opts",
+    "activities": "survey.activities_opts", "days_per_week": "survey.days_opts",
+    "session_length": "survey.session_len_opts", "mood_link": "survey.mood_link_opts",
+    "surgery": "survey.yn_opts", "recovery": "survey.recovery_opts",
+    "pt_after": "survey.yn_opts", "pt_adherence": "pt_adherence_opts",
+}
+
+
+# -----------------
+#  VALUE NORMALIZATION
+# -----------------
+def _to_english() -> Dict[str, Dict[str, str]]:
+    """{option key: {localized word (lowercase): English word}} over every language."""
+    out: Dict[str, Dict[str, str]] = {}
+    for key in set(OPTION_KEYS.values()) | {"likert7"}:
+        english = i18n.catalog(FALLBACK)[key]
+        table = out.setdefault(key, {})
+        for lang in i18n.LANGUAGES:
+            for i, word in enumerate(i18n.catalog(lang)[key]):
+                if i < len(english):
+                    table.setdefault(str(word).strip().lower(), english[i])
+    return out
+
+_ENGLISH = _to_english()
+_LIKERT_NUM = {w.lower(): i for i, w in enumerate(i18n.catalog(FALLBACK)["likert7"], start=1)}
+
+def likert_num(value: Any) -> Optional[int]:
+    """1–7 for a Likert answer in any language (or "1".."7"), None if unknown."""
+    s = str(value).strip().lower()
+    if s.isdigit():
+        n = int(s)
+        return n if 1 <= n <= 7 else None
+    word = _ENGLISH["likert7"].get(s)
+    return _LIKERT_NUM[word.lower()] if word else None
+
+def _english(field_name: str, value: Any) -> Any:
+    key = OPTION_KEYS[field_name]
+    if isinstance(value, list):
+        return [_english(field_name, v) for v in value]
+    if value is None:
+        return None
+    s = str(value).strip()
+    if key == "pt_adherence_opts" and s.isdigit():   # first pilot stored 1..5
+        opts = i18n.catalog(FALLBACK)[key]
+        return opts[int(s) - 1] if 1 <= int(s) <= len(opts) else s
+    return _ENGLISH[key].get(s.lower(), s)
+
+def _is_known(field_name: str, value: Any) -> bool:
+    english = i18n.catalog(FALLBACK)[OPTION_KEYS[field_name]]
+    values = value if isinstance(value, list) else [value]
+    return all(v in english for v in values)
+
+
+# -----------------
+#  CANONICAL RECORD
+# -----------------
+@dataclass
+class SurveyRecord:
+    device_id: str
+    source: str                  # survey.jsonl | survey.json | profile.json
+    line: int                    # record number inside the source file
+    data: Dict[str, Any]         # canonical answers (SURVEY_FIELDS)
+    raw: Dict[str, Any] = field(repr=False, default_factory=dict)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    @cached_property
+    def problems(self) -> List[str]:
+        """Validation, computed on first access only."""
+        out = []
+        for name, value in self.data.items():
+            if name in OPTION_KEYS and value not in (None, "", []) and not _is_known(name, value):
+                out.append(f"{name}: unknown value {value!r}")
+        for k in BIG5_KEYS:
+            v = (self.data.get("big5") or {}).get(k)
+            if v is not None and likert_num(v) is None:
+                out.append(f"big5.{k}: unknown value {v!r}")
+        for name in ("video_q1", "video_q2"):
+            v = self.data.get(name)
+            if v is not None and not (isinstance(v, int) and 1 <= v <= 5):
+                out.append(f"{name}: expected 1–5, got {v!r}")
+        if not self.data.get("lang"):
+            out.append("lang missing")
+        return out
+
+    @property
+    def valid(self) -> bool:
+        return not self.problems
+
+    @cached_property
+    def digest(self) -> str:
+        return storage.content_hash(self.raw)
+
+
+def _canonical_survey(rec: Dict[str, Any]) -> Dict[str, Any]:
+    """survey.json / survey.jsonl record -> canonical answers."""
+    data = {k: rec.get(k) for k in SURVEY_FIELDS}
+    for name in OPTION_KEYS:
+        data[name] = _english(name, data[name])
+    big5 = rec.get("big5") or {}
+    likert = i18n.catalog(FALLBACK)["likert7"]
+    data["big5"] = {k: (likert[likert_num(big5[k]) - 1] if likert_num(big5[k]) else big5[k])
+                    for k in BIG5_KEYS if k in big5}
+    for name in ("video_q1", "video_q2"):
+        try:
+            data[name] = None if data[name] is None else int(data[name])
+        except (TypeError, ValueError):
+            pass
+    if data["activities"] is None:
+        data["activities"] = []
+    return data
+
+def _canonical_profile(rec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    profile.json (quick-profile prototype). Only the answers that map unambiguously
+    onto today's survey are carried over; its 'Good'-style health ratings and exercise
+    day counts used other scales and stay in `raw`.
+    """
+    data: Dict[str, Any] = {k: None for k in SURVEY_FIELDS}
+    data.update(
+        lang=rec.get("lang"),
+        age=None if rec.get("Age") is None else str(rec["Age"]),
+        gender_bio=_english("gender_bio", rec.get("Gender")),
+        employment=_english("employment", rec.get("Employment_status")),
+        emotional=_english("emotional", rec.get("Current_emotional_state")),
+        disability=_english("disability", rec.get("Have_any_physical_disabilities")),
+        activities=_english("activities", rec.get("Activities_list") or rec.get("Type_of_physical_activities") or []),
+        big5={},
+    )
+    return data
+
+
+def canonical(rec: Dict[str, Any], source: str = "survey.jsonl") -> Dict[str, Any]:
+    """One record as stored (any language / generation) -> canonical answers."""
+    return (_canonical_profile if source == "profile.json" else _canonical_survey)(rec)
+
+
+# -----------------
+#  CACHED STREAMING READER
+# -----------------
+# path -> (mtime_ns, size, bytes consumed, records, (inode, prefix check))
+_cache: Dict[str, Tuple[int, int, int, List[SurveyRecord], Tuple[int, bytes]]] = {}
+_cache_lock = threading.Lock()
+_CHECK_BYTES = 4096
+
+def _prefix_check(path: str, consumed: int) -> bytes:
+    """Hash of the first and last few KiB already parsed, to tell an append from a rewrite."""
+    with open(path, "rb") as f:
+        head = f.read(min(consumed, _CHECK_BYTES))
+        f.seek(max(0, consumed - _CHECK_BYTES))
+        tail = f.read(consumed - f.tell())
+    return hashlib.blake2b(head + b"\0" + tail, digest_size=16).digest()
+
+def _file_records(path: str) -> List[SurveyRecord]:
+    st_ = os.stat(path)
+    with _cache_lock:
+        hit = _cache.get(path)
+    if hit and hit[0] == st_.st_mtime_ns and hit[1] == st_.st_size:
+        return hit[3]
+
+    device = os.path.basename(os.path.dirname(path))
+    source = os.path.basename(path)
+    # appended: only parse the new lines. A file that was replaced (ids.migrate,
+    # an editor's save) or changed before the old offset is parsed again.
+    if (hit and path.endswith(".jsonl") and st_.st_size > hit[1] and hit[4][0] == st_.st_ino
+            and _prefix_check(path, hit[2]) == hit[4][1]):
+        start, records = hit[2], list(hit[3])
+    else:
+        start, records = 0, []
+    raw_records, consumed = storage.read_source(path, start)
+    for rec in raw_records:
+        data = canonical(rec, source)
+        data["device_id"] = data.get("device_id") or device
+        records.append(SurveyRecord(device, source, len(records), data, rec))
+    check = (st_.st_ino, _prefix_check(path, consumed) if path.endswith(".jsonl") else b"")
+    with _cache_lock:
+        _cache[path] = (st_.st_mtime_ns, st_.st_size, consumed, records, check)
+    return records
+
+def _survey_files(device_dir: str) -> List[str]:
+    """Oldest generation first, so the last record of the last file is the newest."""
+    names = ("profile.json", "survey.json", "survey.jsonl")
+    return [os.path.join(device_dir, n) for n in names if os.path.isfile(os.path.join(device_dir, n))]
+
+def _dedup(recs: List[SurveyRecord], dedup: str) -> List[SurveyRecord]:
+    """One device's records: all of them, or the first / latest of each distinct answer set."""
+    if dedup == "all":
+        return recs
+    order = recs if dedup == "first" else reversed(recs)
+    chosen: Dict[str, SurveyRecord] = {}
+    for rec in order:
+        chosen.setdefault(rec.digest, rec)
+    keep = {id(r) for r in chosen.values()}
+    return [r for r in recs if id(r) in keep]
+
+def iter_surveys(data_dir: str = "", device_id: Optional[str] = None,
+                 valid_only: bool = False, dedup: str = "all") -> Iterator[SurveyRecord]:
+    """Every survey-like record of the study (or of one device), canonical shape."""
+    if dedup not in storage.DEDUP_MODES:
+        raise ValueError(f"dedup must be one of {storage.DEDUP_MODES}, got {dedup!r}")
+    data_dir = data_dir or storage.DATA_DIR
+    devices = [device_id] if device_id else storage.device_ids(data_dir)
+    for device in devices:
+        recs = [rec for path in _survey_files(os.path.join(data_dir, device)) for rec in _file_records(path)]
+        for rec in _dedup(recs, dedup):
+            if not valid_only or rec.valid:
+                yield rec
+
+def latest_survey(device_id: str, data_dir: str = "") -> Optional[SurveyRecord]:
+    last = None
+    for last in iter_surveys(data_dir, device_id):
+        pass
+    return last
+
+
+if __name__ == "__main__":
+    import sys
+    t0 = datetime.datetime.now()
+    recs = list(iter_surveys(sys.argv[1] if len(sys.argv) > 1 else ""))
+    by_source: Dict[str, int] = {}
+    for r in recs:
+        by_source[r.source] = by_source.get(r.source, 0) + 1
+    bad = [r for r in recs if r.problems]
+    print(f"{len(recs)} records {by_source} in {(datetime.datetime.now() - t0).total_seconds() * 1000:.0f} ms")
+    distinct = sum(1 for _ in iter_surveys(sys.argv[1] if len(sys.argv) > 1 else "", dedup="latest"))
+    print(f"{distinct} distinct answer sets (repeated submissions counted once)")
+    for r in bad:
+        print(f"  {r.device_id}/{r.source}#{r.line}: {'; '.join(r.problems)}")
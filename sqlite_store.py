@@ -0,0 +1,276 @@
+# sqlite_store.py
+"""
+SQLite backend for the app's records (MENTALYTICS_STORE=sqlite).
+
+One database (WAL mode, so readers never block the writer) with one table per
+record kind – consent, survey, agreement, profile, … – all with the same layout:
+
+    id, device_id, run_id, run_key, timestamp, lang, source, line, payload (the record as JSON)
+
+indexed on (device_id, id), timestamp, run_id and (device_id, run_key) – run_key is
+ids.sort_key(run_id), stored at insert time so "since" compares a column. Latest-record
+lookups, per-language counts and exports are indexed queries instead of file scans.
+
+    python sqlite_store.py migrate            # import the existing data/*/ files (re-runnable)
+    python sqlite_store.py stats              # records / languages per table
+"""
+
+import os
+import re
+import sys
+import json
+import sqlite3
+import argparse
+import threading
+from typing import Optional, List, Dict, Iterator
+
+import ids
+import storage
+
+DB_PATH = os.environ.get("MENTALYTICS_SQLITE", os.path.join(storage.DATA_DIR, "mentalytics.sqlite3"))
+KINDS = ("consent", "survey", "agreement", "profile")
+
+_NAME_RE = re.compile(r"^[a-z][a-z0-9_]*$")
+
+_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS {t} (
+    id        INTEGER PRIMARY KEY,
+    device_id TEXT NOT NULL,
+    run_id    TEXT,
+    run_key   TEXT,                          -- ids.sort_key(run_id)
+    timestamp TEXT,
+    lang      TEXT,
+    source    TEXT NOT NULL DEFAULT 'app',   -- app | json | jsonl (migrated)
+    line      INTEGER,                       -- record number inside a migrated file
+    payload   TEXT NOT NULL,
+    UNIQUE (device_id, source, line)
+);
+"""
+_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS {t}_device ON {t} (device_id, id);
+CREATE INDEX IF NOT EXISTS {t}_timestamp ON {t} (timestamp);
+CREATE INDEX IF NOT EXISTS {t}_run ON {t} (run_id);
+CREATE INDEX IF NOT EXISTS {t}_run_key ON {t} (device_id, run_key);
+"""
+
+# drafts.py: one row per device, replaced on every save (the leading "_" keeps it
+# apart from the record kinds, which must match _NAME_RE)
+_DRAFTS_SQL = """
+CREATE TABLE IF NOT EXISTS _drafts (
+    device_id TEXT PRIMARY KEY,
+    payload   TEXT NOT NULL
+);
+"""
+
+
+class SqliteStore:
+    """Same interface as storage.JsonlStore, backed by one SQLite file."""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._tables = set()
+        self._tables_lock = threading.Lock()
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        for kind in KINDS:
+            self._table(kind)
+        self._conn().executescript(_DRAFTS_SQL)
+
+    # ---- connection / schema ----
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (Streamlit runs each session in its own thread)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.create_function("sort_key", 1, ids.sort_key, deterministic=True)
+            self._local.conn = conn
+        return conn
+
+    def _table(self, name: str) -> str:
+        if name not in self._tables:
+            if not _NAME_RE.match(name):
+                raise ValueError(f"invalid record kind {name!r}")
+            with self._tables_lock:
+                conn = self._conn()
+                conn.executescript(_TABLE_SQL.format(t=name))
+                if "run_key" not in {r[1] for r in conn.execute(f"PRAGMA table_info({name})")}:
+                    # databases from before run_key: add and fill it once
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        if "run_key" not in {r[1] for r in conn.execute(f"PRAGMA table_info({name})")}:
+                            conn.execute(f"ALTER TABLE {name} ADD COLUMN run_key TEXT")
+                            conn.execute(f"UPDATE {name} SET run_key = sort_key(CAST(run_id AS TEXT)) WHERE run_id IS NOT NULL")
+                        conn.execute("COMMIT")
+                    except Exception:
+                        conn.execute("ROLLBACK")
+                        raise
+                conn.executescript(_INDEX_SQL.format(t=name))
+                self._tables.add(name)
+        return name
+
+    # ---- store interface ----
+    def append(self, device_id: str, name: str, payload: dict) -> dict:
+        record = {**payload, "run_id": storage.new_run_id()}
+        self._insert(name, device_id, record)
+        return record
+
+    def append_many(self, device_id: str, name: str, payloads: List[dict]) -> List[dict]:
+        """Records with their own run_id (offline sync); run_ids already stored are skipped."""
+        t = self._table(name)
+        conn = self._conn()
+        new = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for p in payloads:
+                rid = p.get("run_id")
+                if not rid or conn.execute(f"SELECT 1 FROM {t} WHERE device_id = ? AND run_id = ?",
+                                           (device_id, rid)).fetchone():
+                    continue
+                self._insert(name, device_id, p, conn=conn)
+                new.append(p)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return new
+
+    def _insert(self, name: str, device_id: str, record: dict, source: str = "app",
+                line: Optional[int] = None, conn: Optional[sqlite3.Connection] = None) -> bool:
+        run_id = record.get("run_id")
+        cur = (conn or self._conn()).execute(
+            f"INSERT OR IGNORE INTO {self._table(name)} "
+            "(device_id, run_id, run_key, timestamp, lang, source, line, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (device_id, run_id, ids.sort_key(str(run_id)) if run_id else None, record.get("timestamp"),
+             record.get("lang"), source, line, json.dumps(record, ensure_ascii=False)),
+        )
+        return cur.rowcount > 0
+
+    def latest(self, device_id: str, name: str) -> dict:
+        return self.nth(device_id, name, -1)
+
+    def nth(self, device_id: str, name: str, n: int) -> dict:
+        t = self._table(name)
+        if n < 0:
+            sql, arg = f"SELECT payload FROM {t} WHERE device_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?", -n - 1
+        else:
+            sql, arg = f"SELECT payload FROM {t} WHERE device_id = ? ORDER BY id LIMIT 1 OFFSET ?", n
+        row = self._conn().execute(sql, (device_id, arg)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def since(self, device_id: str, name: str, run_id: str) -> List[dict]:
+        t = self._table(name)
+        rows = self._conn().execute(
+            f"SELECT payload FROM {t} WHERE device_id = ? AND run_key > ? ORDER BY id",
+            (device_id, ids.sort_key(run_id)),
+        ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def count(self, device_id: str, name: str) -> int:
+        t = self._table(name)
+        return self._conn().execute(f"SELECT COUNT(*) FROM {t} WHERE device_id = ?", (device_id,)).fetchone()[0]
+
+    def save_draft(self, device_id: str, draft: dict):
+        self._conn().execute(
+            "INSERT INTO _drafts (device_id, payload) VALUES (?, ?) "
+            "ON CONFLICT (device_id) DO UPDATE SET payload = excluded.payload",
+            (device_id, json.dumps(draft, ensure_ascii=False)),
+        )
+
+    def load_draft(self, device_id: str) -> dict:
+        row = self._conn().execute("SELECT payload FROM _drafts WHERE device_id = ?", (device_id,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def clear_draft(self, device_id: str):
+        self._conn().execute("DELETE FROM _drafts WHERE device_id = ?", (device_id,))
+
+    # ---- study-wide queries ----
+    def count_by_lang(self, name: str) -> Dict[str, int]:
+        t = self._table(name)
+        rows = self._conn().execute(f"SELECT COALESCE(lang, ''), COUNT(*) FROM {t} GROUP BY 1").fetchall()
+        return dict(rows)
+
+    def export(self, name: str, since_timestamp: str = "") -> Iterator[dict]:
+        """Stream every record of a kind (optionally from a timestamp on), oldest first."""
+        t = self._table(name)
+        cur = self._conn().execute(
+            f"SELECT device_id, payload FROM {t} WHERE COALESCE(timestamp, '') >= ? ORDER BY id",
+            (since_timestamp,),
+        )
+        for device_id, payload in cur:
+            yield {"device_id": device_id, **json.loads(payload)}
+
+    # ---- migration ----
+    def rewrite_run_ids(self, new_id, legacy_re, apply: bool = False) -> Dict[str, int]:
+        """
+        ids.migrate(): legacy run_ids -> new_id(run_id, device_id, line). A row migrated
+        from a .jsonl file keeps its record number in that file, so both backends give
+        the same ids; rows the app wrote here are numbered per device in insertion
+        order. Rows from the first pilot's .json files are left alone, as ids.migrate
+        leaves those files.
+        """
+        counts = {}
+        conn = self._conn()
+        for kind in KINDS:
+            t = self._table(kind)
+            rows = conn.execute(
+                f"SELECT id, device_id, run_id, payload, COALESCE(line, "
+                f"ROW_NUMBER() OVER (PARTITION BY device_id, source ORDER BY id) - 1) "
+                f"FROM {t} WHERE source != 'json' ORDER BY device_id, id"
+            ).fetchall()
+            updates = []
+            for rid, device, run_id, payload, line in rows:
+                if run_id and legacy_re.match(run_id):
+                    new = new_id(run_id, device, line)
+                    rec = {**json.loads(payload), "legacy_run_id": run_id, "run_id": new}
+                    updates.append((new, ids.sort_key(new), json.dumps(rec, ensure_ascii=False), rid))
+            if updates and apply:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(f"UPDATE {t} SET run_id = ?, run_key = ?, payload = ? WHERE id = ?", updates)
+                conn.execute("COMMIT")
+            if updates:
+                counts[kind] = len(updates)
+        return counts
+
+    def migrate(self, data_dir: str = "") -> Dict[str, int]:
+        """
+        Import data/*/<kind>.json and data/*/<kind>.jsonl. Rows are keyed by
+        (device, file type, record number), so running it again only adds new records.
+        """
+        added = {}
+        conn = self._conn()
+        for kind in KINDS:
+            n = 0
+            conn.execute("BEGIN")
+            try:
+                for path in storage.source_files(kind, data_dir):
+                    device = os.path.basename(os.path.dirname(path))
+                    source = "json" if path.endswith(".json") else "jsonl"
+                    records, _ = storage.read_source(path)
+                    for i, rec in enumerate(records):
+                        n += self._insert(kind, device, rec, source, i, conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            added[kind] = n
+        return added
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="SQLite backend: migrate data/ and inspect the database.")
+    ap.add_argument("command", choices=["migrate", "stats"])
+    ap.add_argument("--data", default=storage.DATA_DIR)
+    ap.add_argument("--db", default=DB_PATH)
+    args = ap.parse_args()
+
+    store = SqliteStore(args.db)
+    if args.command == "migrate":
+        print(f"migrated into {args.db}: {store.migrate(args.data)}")
+    for kind in KINDS:
+        print(f"{kind:10s} {sum(store.count_by_lang(kind).values()):6d}  by lang: {store.count_by_lang(kind)}")
+    sys.exit(0)
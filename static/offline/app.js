@@ -0,0 +1,327 @@
+// static/offline/app.js
+// Offline client: welcome -> consent -> survey -> done, rendered from api/form.
+// Nothing here needs the laptop once the page has been opened online once: answers
+// go to the IndexedDB draft as they are given, finished records to the outbox
+// (outbox.js), and the outbox is sent in batches whenever the laptop is reachable.
+
+const DEVICE_KEY = "mentalytics-device";
+const FLUSH_DELAY_MS = 2000;    // collect a few records before sending
+const RETRY_MS = 30000;         // while something is waiting
+const DRAFT_DELAY_MS = 300;     // debounce IndexedDB writes while typing
+
+const root = document.getElementById("app");
+let form = null;
+let draft = { step: "welcome", lang: "en", answers: {} };
+
+// ---------- ids (same as the app) ----------
+const pad = (n) => String(n).padStart(2, "0");
+
+// ids.py: ULID = 48-bit ms time + 80 random bits in Crockford base32, increasing on this phone
+const ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ";
+const RANDOM_MASK = (1n << 80n) - 1n;
+let lastMs = -1;
+let lastRand = 0n;
+
+function ulid(d) {
+  let ms = d.getTime();
+  let rand;
+  if (ms <= lastMs) {
+    ms = lastMs;
+    rand = lastRand + 1n;
+  } else {
+    rand = crypto.getRandomValues(new Uint8Array(10)).reduce((acc, x) => (acc << 8n) | BigInt(x), 0n);
+  }
+  if (rand > RANDOM_MASK) { ms += 1; rand &= RANDOM_MASK; }
+  lastMs = ms;
+  lastRand = rand;
+  let v = (BigInt(ms) << 80n) | rand;
+  let out = "";
+  for (let i = 0; i < 26; i++) {
+    out = ALPHABET[Number(v & 31n)] + out;
+    v >>= 5n;
+  }
+  return out;
+}
+
+function deviceId() {
+  const params = new URLSearchParams(location.search);
+  const id = params.get("device") || localStorage.getItem(DEVICE_KEY) || ulid(new Date());
+  localStorage.setItem(DEVICE_KEY, id);
+  if (params.get("device") !== id) {
+    params.set("device", id);
+    history.replaceState(null, "", `?${params}`);
+  }
+  return id;
+}
+
+function timestamp(d) {   // local time, seconds, like datetime.now().isoformat(timespec="seconds")
+  return `${d.getFullYear()}-${pad(d.getMonth() + 1)}-${pad(d.getDate())}T${pad(d.getHours())}:${pad(d.getMinutes())}:${pad(d.getSeconds())}`;
+}
+
+const runId = ulid;   // storage.new_run_id
+
+const DEVICE = deviceId();
+
+// ---------- form / draft ----------
+async function loadForm(lang) {
+  const resp = await fetch(`api/form?lang=${encodeURIComponent(lang)}`);
+  return resp.json();
+}
+
+let draftTimer = null;
+function keepDraft() {
+  clearTimeout(draftTimer);
+  draftTimer = setTimeout(() => saveDraft(draft), DRAFT_DELAY_MS);
+}
+
+// ---------- sync ----------
+let flushTimer = null;
+let retryTimer = null;
+
+function scheduleFlush() {
+  clearTimeout(flushTimer);
+  flushTimer = setTimeout(flush, FLUSH_DELAY_MS);
+  if ("serviceWorker" in navigator) {
+    navigator.serviceWorker.ready
+      .then((reg) => reg.sync && reg.sync.register("outbox"))
+      .catch(() => undefined);
+  }
+}
+
+async function flush() {
+  const left = navigator.onLine === false ? await pendingCount() : await flushOutbox();
+  clearInterval(retryTimer);
+  if (left) retryTimer = setInterval(flush, RETRY_MS);
+  showStatus(left);
+}
+
+window.addEventListener("online", flush);
+
+// ---------- rendering ----------
+function el(tag, attrs, ...children) {
+  const node = document.createElement(tag);
+  for (const [k, v] of Object.entries(attrs || {})) {
+    if (k.startsWith("on")) node.addEventListener(k.slice(2), v);
+    else if (v === true) node.setAttribute(k, "");
+    else if (v !== false && v != null) node.setAttribute(k, v);
+  }
+  node.append(...children.filter((c) => c != null));
+  return node;
+}
+
+const s = (key) => (form && form.strings[key]) || key;
+
+function header(titleKey) {
+  return [
+    el("h1", { class: "center" }, s(titleKey)),
+    el("p", { class: "center" }, el("span", { class: "badge" }, `${s("device")}:`), " ", el("strong", {}, DEVICE)),
+  ];
+}
+
+function go(step) {
+  draft.step = step;
+  keepDraft();
+  render();
+  window.scrollTo(0, 0);
+}
+
+function renderWelcome() {
+  const buttons = form.languages.map((l) =>
+    el("button", {
+      onclick: async () => {
+        draft.lang = l.code;
+        form = await loadForm(l.code);
+        go("consent");
+      },
+    }, `${l.flag} ${l.name}`));
+  return [
+    el("h1", { class: "center" }, s("app_title")),
+    el("p", { class: "center" }, s("welcome_intro")),
+    el("div", { class: "langs" }, ...buttons),
+  ];
+}
+
+function renderConsent() {
+  const c1 = el("input", { type: "checkbox", onchange: update });
+  const c2 = el("input", { type: "checkbox", onchange: update });
+  const next = el("button", { class: "primary", disabled: true, onclick: submit }, s("continue"));
+  function update() { next.disabled = !(c1.checked && c2.checked); }
+  async function submit() {
+    const now = new Date();
+    await enqueue("consent", DEVICE, {
+      agreed_info: true, agreed_data: true,
+      timestamp: timestamp(now), lang: draft.lang, run_id: runId(now),
+    });
+    scheduleFlush();
+    go("survey");
+  }
+  return [
+    ...header("consent_title"),
+    el("p", {}, s("consent_intro")),
+    el("details", {}, el("summary", {}, s("consent_info_header")), el("div", { class: "md" }, s("consent_md"))),
+    el("label", { class: "check" }, c1, s("consent_check1")),
+    el("label", { class: "check" }, c2, s("consent_check2")),
+    next,
+  ];
+}
+
+// answers are keyed by field ("big5.extrav" for the Big Five items)
+function value(q) {
+  const a = draft.answers;
+  if (q.field in a) return a[q.field];
+  return q.widget === "multi" ? [] : (q.default != null ? q.default : q.options[0]);
+}
+
+function isOther(q, v) {
+  const others = q.other || [];
+  return Array.isArray(v) ? v.some((x) => others.includes(x)) : others.includes(v);
+}
+
+function visible(q) {
+  return !q.if || value(questionByField[q.if.field]) === q.if.equals;
+}
+
+let questionByField = {};
+
+function questionNode(q) {
+  const setValue = (v) => {
+    draft.answers[q.field] = v;
+    keepDraft();
+    applyVisibility();
+  };
+  let input;
+  const v = value(q);
+  if (q.widget === "multi") {
+    input = el("div", { class: "multi" }, ...q.options.map((o) =>
+      el("label", { class: "check" },
+        el("input", {
+          type: "checkbox", checked: v.includes(o),
+          onchange: (e) => {
+            const cur = value(q).filter((x) => x !== o);
+            setValue(e.target.checked ? q.options.filter((x) => cur.includes(x) || x === o) : cur);
+          },
+        }), o)));
+  } else if (q.options.length <= 2) {
+    input = el("div", { class: "radios" }, ...q.options.map((o) =>
+      el("label", {},
+        el("input", { type: "radio", name: q.field, checked: o === v, onchange: () => setValue(o) }), o)));
+  } else {
+    input = el("select", { onchange: (e) => setValue(e.target.value) },
+      ...q.options.map((o) => el("option", { selected: o === v }, o)));
+  }
+  const other = q.other ? el("input", {
+    type: "text", class: "other", placeholder: s("specify"), value: draft.answers[`${q.field}__other`] || "",
+    oninput: (e) => { draft.answers[`${q.field}__other`] = e.target.value; keepDraft(); },
+  }) : null;
+  const node = el("div", { class: "question", "data-field": q.field }, el("p", { class: "label" }, q.label), input, other);
+  if (q.field === "video_q1" && form.video) {
+    node.append(el("div", { class: "video" }, el("iframe", { src: form.video, allowfullscreen: true, loading: "lazy" })));
+  }
+  return node;
+}
+
+function applyVisibility() {
+  for (const node of root.querySelectorAll(".question")) {
+    const q = questionByField[node.dataset.field];
+    node.hidden = !visible(q);
+    const other = node.querySelector(".other");
+    if (other) other.hidden = !isOther(q, value(q));
+  }
+}
+
+function collectSurvey(now) {   // the stored layout of app.collect_survey
+  const get = (f) => (visible(questionByField[f]) ? value(questionByField[f]) : null);
+  const other = (f) => (isOther(questionByField[f], value(questionByField[f])) ? draft.answers[`${f}__other`] || "" : "");
+  const rec = { lang: draft.lang, device_id: DEVICE, timestamp: timestamp(now) };
+  for (const f of Object.keys(questionByField)) {
+    if (!f.startsWith("big5.")) rec[f] = get(f);
+  }
+  rec.industry_other = other("industry");
+  rec.work_type_other = other("work_type");
+  rec.activities_other = other("activities");
+  rec.big5 = {};
+  for (const f of Object.keys(questionByField)) {
+    if (f.startsWith("big5.")) rec.big5[f.slice(5)] = value(questionByField[f]);
+  }
+  rec.video_q1 = parseInt(rec.video_q1, 10);
+  rec.video_q2 = parseInt(rec.video_q2, 10);
+  rec.run_id = runId(now);
+  return rec;
+}
+
+function missingAnswers(rec) {   // app.missing_answers
+  const label = (f) => questionByField[f].label;
+  const missing = [];
+  if (!rec.activities.length) missing.push(label("activities"));
+  for (const f of ["activities", "industry", "work_type"]) {
+    if (isOther(questionByField[f], rec[f]) && !rec[`${f}_other`]) missing.push(`${label(f)} — ${s("specify")}`);
+  }
+  return missing;
+}
+
+function renderSurvey() {
+  questionByField = {};
+  const error = el("p", { class: "error", hidden: true });
+  const nodes = [...header("study_title")];
+  for (const section of form.sections) {
+    nodes.push(el("h3", {}, section.title));
+    for (const q of section.questions) {
+      questionByField[q.field] = q;
+      nodes.push(questionNode(q));
+    }
+  }
+  const save = el("button", {
+    class: "primary",
+    onclick: async () => {
+      const rec = collectSurvey(new Date());
+      const missing = missingAnswers(rec);
+      if (missing.length) {
+        error.textContent = s("missing_fields") + missing.join(", ");
+        error.hidden = false;
+        return;
+      }
+      await enqueue("survey", DEVICE, rec);
+      draft.answers = {};
+      scheduleFlush();
+      go("done");
+    },
+  }, s("save_and_continue"));
+  nodes.push(el("p", { class: "caption" }, s("required_answers")), error, save);
+  return nodes;
+}
+
+function renderDone() {
+  const results = `${form.app_url}?device=${encodeURIComponent(DEVICE)}&lang=${encodeURIComponent(draft.lang)}&step=guidance`;
+  return [
+    ...header("study_title"),
+    el("p", { id: "status", class: "status" }, s("offline_queued")),
+    el("a", { id: "results", class: "button", href: results, hidden: true }, s("offline_results")),
+  ];
+}
+
+function showStatus(left) {
+  const status = document.getElementById("status");
+  if (!status) return;
+  status.textContent = left ? `${s("offline_queued")} ${s("offline_pending")} ${left}` : s("offline_synced");
+  document.getElementById("results").hidden = left > 0;
+}
+
+function render() {
+  const pages = { welcome: renderWelcome, consent: renderConsent, survey: renderSurvey, done: renderDone };
+  root.replaceChildren(...(pages[draft.step] || renderWelcome)(), el("div", { class: "footer" }, s("footer_text")));
+  if (draft.step === "survey") applyVisibility();
+  if (draft.step === "done") pendingCount().then(showStatus);
+}
+
+// ---------- start ----------
+(async () => {
+  if ("serviceWorker" in navigator) {
+    navigator.serviceWorker.register("sw.js").catch(() => undefined);
+  }
+  draft = (await loadDraft()) || draft;
+  form = await loadForm(draft.lang);
+  render();
+  // have every language on the phone before the Wi-Fi goes away
+  form.languages.forEach((l) => { if (l.code !== draft.lang) loadForm(l.code).catch(() => undefined); });
+  flush();
+})();
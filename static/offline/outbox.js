@@ -0,0 +1,81 @@
+// static/offline/outbox.js
+// IndexedDB stores of the offline client, shared by the page (app.js) and the
+// service worker (sw.js):
+//   outbox  finished records waiting to be sent, key "<kind>:<run_id>"
+//   draft   the answers being given right now (survives reloads and Wi-Fi drops)
+// flushOutbox() sends the outbox in batches to api/sync; the server deduplicates by
+// run_id, so sending the same record twice (page and worker at once, lost response)
+// is harmless.
+
+const DB_NAME = "mentalytics-offline";
+const DB_VERSION = 1;
+const SYNC_URL = "api/sync";
+const SYNC_BATCH = 50;
+
+function openDb() {
+  return new Promise((resolve, reject) => {
+    const req = indexedDB.open(DB_NAME, DB_VERSION);
+    req.onupgradeneeded = () => {
+      req.result.createObjectStore("outbox", { keyPath: "id" });
+      req.result.createObjectStore("draft");
+    };
+    req.onsuccess = () => resolve(req.result);
+    req.onerror = () => reject(req.error);
+  });
+}
+
+// Run fn(store) in one transaction; resolves with fn's request result once committed.
+async function withStore(name, mode, fn) {
+  const db = await openDb();
+  return new Promise((resolve, reject) => {
+    const tx = db.transaction(name, mode);
+    const req = fn(tx.objectStore(name));
+    tx.oncomplete = () => { db.close(); resolve(req ? req.result : undefined); };
+    tx.onerror = tx.onabort = () => { db.close(); reject(tx.error); };
+  });
+}
+
+function enqueue(kind, deviceId, record) {
+  const item = { id: `${kind}:${record.run_id}`, kind, device_id: deviceId, record };
+  return withStore("outbox", "readwrite", (s) => s.put(item));
+}
+
+function pendingCount() {
+  return withStore("outbox", "readonly", (s) => s.count());
+}
+
+function loadDraft() {
+  return withStore("draft", "readonly", (s) => s.get("current"));
+}
+
+function saveDraft(draft) {
+  return withStore("draft", "readwrite", (s) => s.put(draft, "current"));
+}
+
+function clearDraft() {
+  return withStore("draft", "readwrite", (s) => s.delete("current"));
+}
+
+// Send everything in the outbox; resolves with the number of records still waiting.
+async function flushOutbox() {
+  for (;;) {
+    const batch = await withStore("outbox", "readonly", (s) => s.getAll(null, SYNC_BATCH));
+    if (!batch.length) return 0;
+    let results;
+    try {
+      const resp = await fetch(SYNC_URL, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ records: batch.map(({ kind, device_id, record }) => ({ kind, device_id, record })) }),
+      });
+      if (!resp.ok) throw new Error(`sync: HTTP ${resp.status}`);
+      results = (await resp.json()).results;
+    } catch (e) {
+      return pendingCount();   // offline or laptop unreachable: keep everything, retry later
+    }
+    // stored / duplicate: it is on the laptop; rejected: it never will be, don't retry forever
+    await withStore("outbox", "readwrite", (s) => {
+      batch.forEach((item, i) => { if (results[i]) s.delete(item.id); });
+    });
+  }
+}
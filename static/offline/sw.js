@@ -0,0 +1,58 @@
+// static/offline/sw.js
+// Service worker of the offline client: keeps the page, its scripts and the
+// questionnaire of every language on the phone, and sends the outbox when the
+// browser reports connectivity again (Background Sync, where supported).
+
+importScripts("outbox.js");
+
+const CACHE = "mentalytics-offline-v1";
+const SHELL = ["./", "app.js", "outbox.js", "manifest.webmanifest"];
+
+// the shell plus the questionnaire of every language
+async function precache() {
+  const cache = await caches.open(CACHE);
+  await cache.addAll(SHELL);
+  const form = await (await fetch("api/form")).json();
+  await cache.addAll(form.languages.map((l) => `api/form?lang=${encodeURIComponent(l.code)}`));
+}
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(precache().then(() => self.skipWaiting()));
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil(
+    caches.keys()
+      .then((keys) => Promise.all(keys.filter((k) => k !== CACHE).map((k) => caches.delete(k))))
+      .then(() => self.clients.claim())
+  );
+});
+
+// Stale-while-revalidate: answer from the cache at once (a request on a flaky Wi-Fi
+// can hang for many seconds before it fails) and refresh the cached copy behind it.
+async function cachedThenRefresh(event) {
+  const request = event.request;
+  const cache = await caches.open(CACHE);
+  const refresh = fetch(request).then((resp) => {
+    if (resp.ok) cache.put(request, resp.clone());
+    return resp;
+  });
+  // the page itself is cached without ?device=…
+  const hit = await cache.match(request, { ignoreSearch: request.mode === "navigate" });
+  if (hit) {
+    event.waitUntil(refresh.catch(() => undefined));
+    return hit;
+  }
+  return refresh;
+}
+
+self.addEventListener("fetch", (event) => {
+  const url = new URL(event.request.url);
+  if (event.request.method !== "GET" || url.origin !== self.location.origin) return;
+  if (!url.pathname.startsWith(new URL("./", self.location).pathname)) return;
+  event.respondWith(cachedThenRefresh(event));
+});
+
+self.addEventListener("sync", (event) => {
+  if (event.tag === "outbox") event.waitUntil(flushOutbox());
+});
@@ -0,0 +1,747 @@
+# storage.py
+"""
+Per-device local storage: data/<DEVICE_ID>/<name>.jsonl (1 line = 1 JSON object)
+
+Every JSONL file gets a small sidecar index `<name>.jsonl.idx` holding the byte
+offset of each record (8 bytes per record), and `<name>.jsonl.keys` holding each
+record's run_id sort key, so "latest", "nth" and "since run_id" lookups don't have
+to read the whole file.
+
+Writes go through one writer thread per process and take a per-device file lock
+(data/<DEVICE_ID>/.lock), so sessions and worker processes sharing a device never
+interleave partial lines.
+
+A record whose answers are already in the file (same content, only timestamp /
+run_id differ) is stored as a short reference to the first one; a second sidecar
+`<name>.jsonl.hash` holds each record's content hash. Readers resolve references.
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import struct
+import hashlib
+import threading
+import contextlib
+from concurrent.futures import Future
+from typing import Optional, List, Dict, Tuple, Iterator
+
+import ids
+
+# Cross-process file locks (several app workers / tabs sharing one device folder)
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+DATA_DIR = "data"
+
+_OFFSET = struct.Struct("<Q")   # one little-endian uint64 per record
+_TAIL_BLOCK = 4096
+
+
+def device_dir(device_id: str) -> str:
+    d = os.path.join(DATA_DIR, device_id)
+    os.makedirs(d, exist_ok=True)
+    return d
+
+def jsonl_path(device_id: str, name: str) -> str:
+    return os.path.join(device_dir(device_id), f"{name}.jsonl")
+
+def _index_path(path: str) -> str:
+    return path + ".idx"
+
+
+# -----------------
+#  DEVICE LOCK
+# -----------------
+LOCK_NAME = ".lock"
+
+@contextlib.contextmanager
+def device_lock(path: str, name: str = LOCK_NAME):
+    """
+    Exclusive lock on the device folder containing `path`, held while a file of
+    that folder (or its index) is modified. Works across threads and processes;
+    never nest it for the same folder. Another `name` is a separate lock of the
+    same folder, for work that spans several writes.
+    """
+    fd = os.open(os.path.join(os.path.dirname(path), name), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:   # LK_LOCK gives up after ~10 s, keep waiting
+                    continue
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            with contextlib.suppress(OSError):
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        os.close(fd)
+
+def _synced_count(path: str) -> int:
+    with device_lock(path):
+        return _sync_index(path)
+
+
+# -----------------
+#  OFFSET INDEX
+# -----------------
+def _scan_offsets(f, start: int) -> List[int]:
+    """Offsets of the non-blank lines found from `start` to EOF."""
+    f.seek(start)
+    offsets, pos = [], start
+    for line in f:
+        if line.strip():
+            offsets.append(pos)
+        pos += len(line)
+    return offsets
+
+def _sync_index(path: str) -> int:
+    """
+    Make the sidecar index match the JSONL file and return the record count.
+    Normally this only checks the last indexed line (constant time); files written
+    before the index existed, or by hand, are (re)indexed from the last good entry.
+    """
+    idx = _index_path(path)
+    size = os.path.getsize(path)
+    with open(path, "rb") as f, open(idx, "a+b") as fi:
+        fi.seek(0, os.SEEK_END)
+        n = fi.tell() // _OFFSET.size
+        start, keep = 0, 0
+        if n:
+            fi.seek((n - 1) * _OFFSET.size)
+            last = _OFFSET.unpack(fi.read(_OFFSET.size))[0]
+            prev_ok = last == 0
+            if 0 < last <= size:
+                f.seek(last - 1)
+                prev_ok = f.read(1) == b"\n"
+            if prev_ok and last < size:
+                f.seek(last)
+                end = last + len(f.readline())
+                if end == size:
+                    return n
+                start, keep = end, n
+        new = _scan_offsets(f, start)
+        fi.truncate(keep * _OFFSET.size)
+        fi.seek(0, os.SEEK_END)
+        fi.write(b"".join(_OFFSET.pack(o) for o in new))
+        return keep + len(new)
+
+def _read_offset(path: str, i: int) -> int:
+    with open(_index_path(path), "rb") as fi:
+        fi.seek(i * _OFFSET.size)
+        return _OFFSET.unpack(fi.read(_OFFSET.size))[0]
+
+def _read_record_at(path: str, offset: int) -> dict:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        line = f.readline()
+    try:
+        return json.loads(line.decode("utf-8"))
+    except Exception:
+        return {}
+
+
+# -----------------
+#  CONTENT HASHES (repeated submissions)
+# -----------------
+# Going back and saving the same answers again gives a record that differs only in
+# timestamp / run_id. Each record's content hash (those fields and device_id left
+# out) is kept in
+# `<name>.jsonl.hash`, 16 bytes per record, numbered like the offset index. A record
+# whose hash is already in the file is written as a reference to the first one:
+#
+#     {"dup_of": 3, "hash": "9f2c…", "timestamp": "…", "run_id": "…"}
+#
+# latest / nth / since / read_source / iter_source return it resolved: the first
+# record's answers with its own timestamp and run_id, plus `duplicate_of` (the run_id
+# of the first one). iter_source(path, dedup=) picks "all" submissions, the "first"
+# or the "latest" of each distinct answer set from the sidecar, without parsing.
+DEDUP = os.environ.get("MENTALYTICS_DEDUP", "on") != "off"
+DEDUP_MODES = ("all", "first", "latest")
+VOLATILE_KEYS = ("timestamp", "run_id", "legacy_run_id", "duplicate_of")
+_HASH_SIZE = 16
+
+# path -> (records covered, {digest: number of its first record}); per process
+_hash_index: Dict[str, Tuple[int, Dict[bytes, int]]] = {}
+
+def content_hash(record: dict) -> str:
+    """Hash of a record's answers: key order, timestamp, run_id and device_id don't matter."""
+    body = {k: v for k, v in record.items() if k not in VOLATILE_KEYS and k != "device_id"}
+    blob = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(blob, digest_size=_HASH_SIZE).hexdigest()
+
+def _hash_path(path: str) -> str:
+    return path + ".hash"
+
+def _line_digest(line: bytes) -> bytes:
+    try:
+        rec = json.loads(line.decode("utf-8"))
+    except Exception:   # corrupt line: never equal to anything else
+        return hashlib.blake2b(line, digest_size=_HASH_SIZE).digest()
+    return bytes.fromhex(rec["hash"]) if "dup_of" in rec else bytes.fromhex(content_hash(rec))
+
+def _sync_hashes(path: str, n: int):
+    """Bring the hash sidecar to the file's n records (under the device lock)."""
+    with open(_hash_path(path), "a+b") as fh:
+        have = fh.seek(0, os.SEEK_END) // _HASH_SIZE
+        if have > n:   # the file was rewritten
+            have = 0
+        fh.truncate(have * _HASH_SIZE)
+        if have == n:
+            return
+        new = []
+        with open(path, "rb") as f:
+            f.seek(_read_offset(path, have))
+            for line in f:
+                if len(new) == n - have:
+                    break
+                if line.strip():
+                    new.append(_line_digest(line))
+        fh.write(b"".join(new))
+
+def _first_records(path: str, n: int) -> Dict[bytes, int]:
+    """{digest: number of its first record} over the n records (sidecar in sync)."""
+    count, first = _hash_index.get(path, (0, {}))
+    if count > n:
+        count, first = 0, {}
+    if count < n:
+        with open(_hash_path(path), "rb") as fh:
+            fh.seek(count * _HASH_SIZE)
+            data = fh.read((n - count) * _HASH_SIZE)
+        for i in range(0, len(data), _HASH_SIZE):
+            first.setdefault(data[i:i + _HASH_SIZE], count + i // _HASH_SIZE)
+    _hash_index[path] = (n, first)
+    return first
+
+def record_hashes(path: str) -> List[bytes]:
+    """Content hash of every record of a JSONL file, in file order."""
+    with device_lock(path):
+        n = _sync_index(path)
+        _sync_hashes(path, n)
+    with open(_hash_path(path), "rb") as fh:
+        data = fh.read(n * _HASH_SIZE)
+    return [data[i:i + _HASH_SIZE] for i in range(0, len(data), _HASH_SIZE)]
+
+def _resolve(path: str, rec: dict) -> dict:
+    """A stored reference -> the full record it stands for."""
+    if "dup_of" not in rec:
+        return rec
+    try:
+        first = _read_record_at(path, _read_offset(path, rec["dup_of"]))
+    except (OSError, struct.error):   # index missing or behind: bring it up to date
+        _synced_count(path)
+        first = _read_record_at(path, _read_offset(path, rec["dup_of"]))
+    out = {k: v for k, v in first.items() if k not in VOLATILE_KEYS}
+    out.update((k, v) for k, v in rec.items() if k in VOLATILE_KEYS)
+    out["duplicate_of"] = first.get("run_id")
+    return out
+
+
+# -----------------
+#  RUN_ID KEYS (since)
+# -----------------
+# `<name>.jsonl.keys` holds, numbered like the offset index, 52 bytes per record: the
+# record's ids.sort_key(run_id) and the largest key up to and including it, 26 ASCII
+# bytes each. Records synced from a phone keep the run_id they were made with, so the
+# file is not always in run_id order, but the running maximum is: since() binary
+# searches it for the first record that may be later and compares keys from there on,
+# parsing only the records it returns.
+_KEY_SIZE = 26                 # a ULID; legacy run_ids sort as one
+_KEY_ENTRY = 2 * _KEY_SIZE
+_NO_KEY = b"\0" * _KEY_SIZE     # missing / unreadable run_id: earlier than any
+
+def _key_path(path: str) -> str:
+    return path + ".keys"
+
+def _key(run_id: str) -> bytes:
+    return ids.sort_key(run_id).encode("ascii", "replace")[:_KEY_SIZE].ljust(_KEY_SIZE, b"\0")
+
+def _line_key(line: bytes) -> bytes:
+    try:
+        rid = json.loads(line.decode("utf-8")).get("run_id")
+    except Exception:
+        return _NO_KEY
+    return _key(rid) if isinstance(rid, str) else _NO_KEY
+
+def _append_keys(fk, have: int, keys: List[bytes]):
+    """Add the entries of records have, have+1, … to the open (a+b) key sidecar."""
+    top = _NO_KEY
+    if have:
+        fk.seek((have - 1) * _KEY_ENTRY + _KEY_SIZE)
+        top = fk.read(_KEY_SIZE)
+    out = []
+    for k in keys:
+        top = max(top, k)
+        out.append(k + top)
+    fk.write(b"".join(out))
+
+def _sync_keys(path: str, n: int):
+    """Bring the key sidecar to the file's n records (under the device lock)."""
+    with open(_key_path(path), "a+b") as fk:
+        have = fk.seek(0, os.SEEK_END) // _KEY_ENTRY
+        if have > n:   # the file was rewritten
+            have = 0
+        fk.truncate(have * _KEY_ENTRY)
+        if have == n:
+            return
+        keys = []
+        with open(path, "rb") as f:
+            f.seek(_read_offset(path, have))
+            for line in f:
+                if len(keys) == n - have:
+                    break
+                if line.strip():
+                    keys.append(_line_key(line))
+        _append_keys(fk, have, keys)
+
+
+# -----------------
+#  WRITER (group commit)
+# -----------------
+# Tunables, overridable from the environment or via configure_writer()
+WRITE_MAX_BATCH = int(os.environ.get("MENTALYTICS_WRITE_MAX_BATCH", "256"))      # records per flush
+WRITE_MAX_DELAY = float(os.environ.get("MENTALYTICS_WRITE_MAX_DELAY_MS", "5")) / 1000  # wait for more records
+FSYNC_POLICIES = ("batch", "off")   # batch: one fsync per file per flush / off: leave it to the OS
+WRITE_FSYNC = os.environ.get("MENTALYTICS_FSYNC", "batch")
+
+
+def _write_records(path: str, records: List[dict], fsync: bool):
+    """Write records with a single write() and index them, under the device lock."""
+    with device_lock(path):
+        _write_records_locked(path, records, fsync)
+
+def _write_records_locked(path: str, records: List[dict], fsync: bool):
+    """
+    Serialize records (repeats as references, see CONTENT HASHES), write them and
+    add their run_ids to the key sidecar.
+    """
+    n = _sync_index(path) if os.path.isfile(path) else 0
+    _sync_keys(path, n)
+    if DEDUP:
+        _write_deduped_locked(path, records, n, fsync)
+    else:
+        _write_lines_locked(path, [_encode(r) for r in records], fsync)
+    with open(_key_path(path), "a+b") as fk:
+        _append_keys(fk, n, [_key(r["run_id"]) if isinstance(r.get("run_id"), str) else _NO_KEY
+                             for r in records])
+
+def _write_deduped_locked(path: str, records: List[dict], n: int, fsync: bool):
+    if n:
+        _sync_hashes(path, n)
+    first = dict(_first_records(path, n)) if n else {}
+    lines, digests = [], []
+    for rec in records:
+        h = content_hash(rec)
+        d = bytes.fromhex(h)
+        if d in first:
+            rec = {"dup_of": first[d], "hash": h, **{k: rec[k] for k in VOLATILE_KEYS if k in rec}}
+        else:
+            first[d] = n + len(lines)
+        lines.append(_encode(rec))
+        digests.append(d)
+    _write_lines_locked(path, lines, fsync)
+    with open(_hash_path(path), "ab") as fh:
+        fh.write(b"".join(digests))
+    _hash_index[path] = (n + len(lines), first)
+
+def _encode(record: dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+def _write_lines_locked(path: str, lines: List[bytes], fsync: bool):
+    existed = os.path.isfile(path)
+    if existed:
+        _sync_index(path)
+    with open(path, "a+b") as f:
+        offset = f.seek(0, os.SEEK_END)
+        prefix = b""
+        if offset:
+            f.seek(offset - 1)
+            if f.read(1) != b"\n":   # never glue a record onto a cut-off line
+                prefix = b"\n"
+        offset += len(prefix)
+        offsets = []
+        for line in lines:
+            offsets.append(offset)
+            offset += len(line)
+        f.write(prefix + b"".join(lines))
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    if fsync and not existed:   # make the new directory entry durable too
+        dfd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+        try:
+            os.fsync(dfd)
+        finally:
+            os.close(dfd)
+    with open(_index_path(path), "ab") as fi:
+        fi.write(b"".join(_OFFSET.pack(o) for o in offsets))
+
+
+class JsonlWriter:
+    """
+    One writer thread per process. Sessions enqueue (path, record) and get a Future;
+    the thread drains the queue in batches (up to max_batch records or max_delay
+    seconds after the first one), writes each file's records in one go and fsyncs
+    once per file per batch (group commit).
+    """
+
+    def __init__(self, max_batch: int = WRITE_MAX_BATCH, max_delay: float = WRITE_MAX_DELAY,
+                 fsync: str = WRITE_FSYNC):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.max_batch, self.max_delay, self.fsync = max_batch, max_delay, fsync
+        self._queue: "queue.Queue[Tuple[str, Optional[dict], Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="jsonl-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, path: str, record: Optional[dict]) -> Future:
+        fut: Future = Future()
+        self._queue.put((path, record, fut))
+        return fut
+
+    def flush(self):
+        """Block until everything submitted so far is written."""
+        self.submit("", None).result()
+
+    def _next_batch(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            by_path: Dict[str, list] = {}
+            for path, record, fut in batch:
+                by_path.setdefault(path, []).append((record, fut))
+            for path, items in by_path.items():
+                try:
+                    if path:   # "" = flush marker
+                        _write_records(path, [record for record, _ in items], self.fsync == "batch")
+                except Exception as e:
+                    for _, fut in items:
+                        fut.set_exception(e)
+                else:
+                    for _, fut in items:
+                        fut.set_result(None)
+
+
+_writer: Optional[JsonlWriter] = None
+_writer_lock = threading.Lock()
+
+def get_writer() -> JsonlWriter:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = JsonlWriter()
+            atexit.register(_writer.flush)
+        return _writer
+
+def configure_writer(max_batch: int = WRITE_MAX_BATCH, max_delay: float = WRITE_MAX_DELAY,
+                     fsync: str = WRITE_FSYNC) -> JsonlWriter:
+    """Replace the process-wide writer (pending records of the old one are flushed first)."""
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.flush()
+        _writer = JsonlWriter(max_batch, max_delay, fsync)
+        return _writer
+
+
+# -----------------
+#  APPEND / READ
+# -----------------
+def new_run_id() -> str:
+    """Time-ordered and unique, also for two saves in the same second (ids.py)."""
+    return ids.new_id()
+
+def append_jsonl(device_id: str, name: str, payload: dict) -> dict:
+    """
+    Append one record (adds a run_id to track runs) through the process-wide writer
+    and wait until it is on disk. Returns the stored record.
+    """
+    record = {**payload, "run_id": new_run_id()}
+    get_writer().submit(jsonl_path(device_id, name), record).result()
+    return record
+
+def append_many_jsonl(device_id: str, name: str, payloads: List[dict]) -> List[dict]:
+    """
+    Append records that already carry their run_id (made on a phone while offline,
+    see sync_server.py), skipping run_ids the file already holds – a batch that is
+    sent twice is stored once. Returns the records actually written.
+    """
+    path = jsonl_path(device_id, name)
+    with device_lock(path):
+        seen = set()
+        if os.path.isfile(path):
+            _sync_keys(path, _sync_index(path))
+            with open(_key_path(path), "rb") as fk:
+                data = fk.read()
+            seen = {data[i:i + _KEY_SIZE] for i in range(0, len(data), _KEY_ENTRY)}
+        new = []
+        for p in payloads:
+            key = _key(p["run_id"]) if isinstance(p.get("run_id"), str) and p["run_id"] else None
+            if key and key not in seen:
+                seen.add(key)
+                new.append(p)
+        if new:
+            _write_records_locked(path, new, fsync=get_writer().fsync == "batch")
+    return new
+
+def load_latest_jsonl(device_id: str, name: str) -> dict:
+    """Last parseable record, read backwards from EOF (no full scan)."""
+    path = jsonl_path(device_id, name)
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        tail = b""
+        while pos > 0:
+            step = min(_TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+            lines = tail.split(b"\n")
+            # lines[0] may be cut in half unless we reached the start of the file
+            complete = lines if pos == 0 else lines[1:]
+            for line in reversed(complete):
+                if not line.strip():
+                    continue
+                try:
+                    rec = json.loads(line.decode("utf-8"))
+                except Exception:
+                    continue   # partial / corrupt line: fall back to the previous one
+                return _resolve(path, rec)
+            tail = lines[0] if pos > 0 else b""
+    return {}
+
+def count_jsonl(device_id: str, name: str) -> int:
+    path = jsonl_path(device_id, name)
+    return _synced_count(path) if os.path.isfile(path) else 0
+
+def load_nth_jsonl(device_id: str, name: str, n: int) -> dict:
+    """n-th record (0 = first, -1 = latest), {} if out of range."""
+    path = jsonl_path(device_id, name)
+    if not os.path.isfile(path):
+        return {}
+    total = _synced_count(path)
+    if n < 0:
+        n += total
+    if not 0 <= n < total:
+        return {}
+    return _resolve(path, _read_record_at(path, _read_offset(path, n)))
+
+def load_since_jsonl(device_id: str, name: str, run_id: str) -> List[dict]:
+    """
+    All records with a later run_id than `run_id` (ids.sort_key also orders the older
+    YYYYmmdd-HHMMSS ones), in file order, found in the key sidecar (see RUN_ID KEYS):
+    synced records can be out of run_id order, so each key after the first candidate
+    is compared.
+    """
+    path = jsonl_path(device_id, name)
+    if not os.path.isfile(path):
+        return []
+    with device_lock(path):
+        n = _sync_index(path)
+        _sync_keys(path, n)
+    key = _key(run_id)
+    with open(_key_path(path), "rb") as fk:
+        lo, hi = 0, n
+        while lo < hi:   # first record whose running maximum is later than `key`
+            mid = (lo + hi) // 2
+            fk.seek(mid * _KEY_ENTRY + _KEY_SIZE)
+            if fk.read(_KEY_SIZE) > key:
+                hi = mid
+            else:
+                lo = mid + 1
+        fk.seek(lo * _KEY_ENTRY)
+        data = fk.read((n - lo) * _KEY_ENTRY)
+    later = [lo + j // _KEY_ENTRY for j in range(0, len(data), _KEY_ENTRY) if data[j:j + _KEY_SIZE] > key]
+    return [_resolve(path, _read_record_at(path, _read_offset(path, i))) for i in later]
+
+
+# -----------------
+#  WHOLE DATA TREE
+# -----------------
+def device_ids(data_dir: str = "") -> List[str]:
+    data_dir = data_dir or DATA_DIR
+    if not os.path.isdir(data_dir):
+        return []
+    return sorted(d for d in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, d)))
+
+def source_files(name: str, data_dir: str = "") -> List[str]:
+    """Every file holding `name` records: legacy data/*/<name>.json and data/*/<name>.jsonl."""
+    data_dir = data_dir or DATA_DIR
+    out = []
+    for device in device_ids(data_dir):
+        for ext in (".json", ".jsonl"):
+            p = os.path.join(data_dir, device, name + ext)
+            if os.path.isfile(p):
+                out.append(p)
+    return out
+
+def read_source(path: str, start: int = 0) -> Tuple[List[dict], int]:
+    """
+    Records of a source file from byte `start` on, and the byte offset reached.
+    A legacy .json file is one record; a trailing .jsonl line without its newline
+    is still being written and is left for the next call.
+    """
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.load(f)], os.path.getsize(path)
+    records, consumed = [], start
+    with open(path, "rb") as f:
+        f.seek(start)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            consumed += len(line)
+            if line.strip():
+                try:
+                    records.append(_resolve(path, json.loads(line.decode("utf-8"))))
+                except Exception:
+                    records.append({"_unparseable": line.decode("utf-8", "replace").strip()})
+    return records, consumed
+
+def iter_numbered(path: str, dedup: str = "all", resolve: bool = True) -> Iterator[Tuple[int, dict]]:
+    """
+    (record number, record) of a source file, one at a time (a .jsonl file is never
+    held in memory). dedup="first"/"latest" keeps one record per distinct answer set,
+    chosen from the hash sidecar; resolve=False leaves references as stored.
+    """
+    if dedup not in DEDUP_MODES:
+        raise ValueError(f"dedup must be one of {DEDUP_MODES}, got {dedup!r}")
+    if path.endswith(".json"):
+        yield 0, read_source(path)[0][0]
+        return
+    keep = None
+    if dedup != "all":
+        digests = record_hashes(path)
+        order = range(len(digests)) if dedup == "first" else range(len(digests) - 1, -1, -1)
+        chosen: Dict[bytes, int] = {}
+        for i in order:
+            chosen.setdefault(digests[i], i)
+        keep = set(chosen.values())
+    i = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            if not line.strip():
+                continue
+            if keep is None or i in keep:
+                try:
+                    rec = json.loads(line.decode("utf-8"))
+                except Exception:
+                    rec = {"_unparseable": line.decode("utf-8", "replace").strip()}
+                yield i, (_resolve(path, rec) if resolve else rec)
+            i += 1
+
+def iter_source(path: str, dedup: str = "all", resolve: bool = True) -> Iterator[dict]:
+    """Like read_source(path), one record at a time; see iter_numbered()."""
+    for _, rec in iter_numbered(path, dedup, resolve):
+        yield rec
+
+
+# -----------------
+#  DRAFTS
+# -----------------
+# data/<DEVICE_ID>/draft.json: where a participant is in the flow and the answers
+# given so far (drafts.py). Replaced as a whole (write + rename), never appended:
+# only the newest snapshot is worth keeping.
+DRAFT_FILE = "draft.json"
+
+def save_draft_file(device_id: str, draft: dict):
+    path = os.path.join(device_dir(device_id), DRAFT_FILE)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(draft, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def load_draft_file(device_id: str) -> dict:
+    try:
+        with open(os.path.join(DATA_DIR, device_id, DRAFT_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def clear_draft_file(device_id: str):
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(os.path.join(DATA_DIR, device_id, DRAFT_FILE))
+
+
+# -----------------
+#  BACKENDS
+# -----------------
+# The app talks to a "store" (append / latest / nth / since / count; append_many for
+# the offline sync endpoint; save/load/clear_draft for drafts.py). JsonlStore is
+# the data/<DEVICE_ID>/*.jsonl layout above; SqliteStore (sqlite_store.py) keeps the
+# same records in one SQLite database. Pick one with MENTALYTICS_STORE=jsonl|sqlite.
+STORE_BACKEND = os.environ.get("MENTALYTICS_STORE", "jsonl")
+
+
+class JsonlStore:
+    """Per-device JSONL files (the default)."""
+
+    def append(self, device_id: str, name: str, payload: dict) -> dict:
+        return append_jsonl(device_id, name, payload)
+
+    def append_many(self, device_id: str, name: str, payloads: List[dict]) -> List[dict]:
+        return append_many_jsonl(device_id, name, payloads)
+
+    def latest(self, device_id: str, name: str) -> dict:
+        return load_latest_jsonl(device_id, name)
+
+    def nth(self, device_id: str, name: str, n: int) -> dict:
+        return load_nth_jsonl(device_id, name, n)
+
+    def since(self, device_id: str, name: str, run_id: str) -> List[dict]:
+        return load_since_jsonl(device_id, name, run_id)
+
+    def count(self, device_id: str, name: str) -> int:
+        return count_jsonl(device_id, name)
+
+    def save_draft(self, device_id: str, draft: dict):
+        save_draft_file(device_id, draft)
+
+    def load_draft(self, device_id: str) -> dict:
+        return load_draft_file(device_id)
+
+    def clear_draft(self, device_id: str):
+        clear_draft_file(device_id)
+
+
+_store = None
+
+def get_store():
+    """Process-wide store selected by MENTALYTICS_STORE."""
+    global _store
+    if _store is None:
+        if STORE_BACKEND == "sqlite":
+            import sqlite_store
+            _store = sqlite_store.SqliteStore()
+        elif STORE_BACKEND == "jsonl":
+            _store = JsonlStore()
+        else:
+            raise ValueError(f"MENTALYTICS_STORE must be 'jsonl' or 'sqlite', got {STORE_BACKEND!r}")
+    return _store
@@ -0,0 +1,313 @@
+# study_store.py
+"""
+Columnar study store: compacts every device folder of data/ into typed Parquet files
+
+    study/<kind>/part-00000.parquet, part-00001.parquet, ...     kind = consent | survey | agreement | profile
+
+- big5 is flattened into big5_<trait> (answer as given) + big5_<trait>_num (1–7),
+  NRS/health answers are small ints, categorical answers are dictionary-encoded
+  (pandas `category`), timestamps are real timestamps.
+- Incremental: study/_manifest.json remembers how far each source file was read, so a
+  run only ingests what was appended since the last one (one new part per kind).
+  If a source changed in any other way, that kind is rebuilt from scratch; so is
+  everything when SCHEMA_VERSION changed.
+- content_hash (storage.content_hash) groups repeated submissions of the same
+  answers; load(kind, dedup="latest" | "first") keeps one row per device and hash.
+
+    python study_store.py              # ingest new appends
+    python study_store.py --rebuild    # rewrite everything (one part per kind)
+    python study_store.py --watch 30   # keep ingesting every 30 s
+
+    import study_store; df = study_store.load("survey", dedup="latest")
+
+Needs pyarrow (optional dependency, not used by the app itself).
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import datetime
+import argparse
+from typing import Optional, List, Dict, Any, Tuple
+
+import pandas as pd
+
+import records
+import storage
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except Exception:
+    PYARROW_AVAILABLE = False
+
+STORE_DIR = "study"
+MANIFEST = "_manifest.json"
+SCHEMA_VERSION = 2   # 2: content_hash, duplicate_of
+MAX_PARTS = 16    # merge parts once a kind has more than this
+
+KINDS = ("consent", "survey", "agreement", "profile")
+BIG5_KEYS = records.BIG5_KEYS
+
+
+# -----------------
+#  SCHEMAS
+# -----------------
+def _cat():
+    return pa.dictionary(pa.int32(), pa.string())
+
+def _schemas() -> Dict[str, "pa.Schema"]:
+    common = [
+        ("device_id", _cat()), ("source", _cat()), ("line", pa.int32()),
+        ("run_id", pa.string()), ("timestamp", pa.timestamp("s")), ("lang", _cat()),
+        ("content_hash", pa.string()), ("duplicate_of", pa.string()),
+    ]
+    survey_cats = ["gender_bio", "marital", "disability", "sleep_hours", "sleep_problem",
+                   "employment", "industry", "work_type", "emotional", "stress",
+                   "days_per_week", "session_length", "mood_link", "surgery",
+                   "recovery", "pt_after", "pt_adherence"]
+    return {
+        "consent": pa.schema(common + [
+            ("agreed_info", pa.bool_()), ("agreed_data", pa.bool_()), ("extra", pa.string()),
+        ]),
+        "survey": pa.schema(
+            common
+            + [("age", pa.int16())]
+            + [(c, _cat()) for c in survey_cats]
+            + [("industry_other", pa.string()), ("work_type_other", pa.string()),
+               ("activities", pa.list_(pa.string())), ("activities_other", pa.string()),
+               ("overall_health", pa.int8()), ("mobility", pa.int8()),
+               ("video_q1", pa.int8()), ("video_q2", pa.int8())]
+            + [(f"big5_{k}", _cat()) for k in BIG5_KEYS]
+            + [(f"big5_{k}_num", pa.int8()) for k in BIG5_KEYS]
+            + [("extra", pa.string())]
+        ),
+        "agreement": pa.schema(common + [("agree_with_model", pa.bool_()), ("extra", pa.string())]),
+        "profile": pa.schema(common + [
+            ("Age", pa.int16()), ("Gender", _cat()), ("Employment_status", _cat()),
+            ("Current_emotional_state", _cat()), ("Have_any_physical_disabilities", _cat()),
+            ("Type_of_physical_activities", pa.list_(pa.string())),
+            ("How_many_days_do_you_do_exercise", pa.int8()),
+            ("Overall_health_status", _cat()), ("Current_mobility", _cat()),
+            ("Activities_list", pa.list_(pa.string())),
+        ] + [(c, pa.int16()) for c in ("Age_idx", "Gender_idx", "Employment_idx", "Emotion_idx",
+                                       "Disability_idx", "Days_idx", "Overall_idx", "Mobility_idx")]
+          + [("extra", pa.string())]),
+    }
+
+
+# -----------------
+#  ROW FLATTENING
+# -----------------
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(str(value).strip())
+    except Exception:
+        return None
+
+def _to_ts(value: Any) -> Optional[datetime.datetime]:
+    try:
+        return datetime.datetime.fromisoformat(str(value))
+    except Exception:
+        return None
+
+def _consent_flags(rec: dict) -> Tuple[Optional[bool], Optional[bool]]:
+    """The consent page saved its checkboxes under four different names over time."""
+    if "agreed" in rec:
+        return bool(rec["agreed"]), bool(rec["agreed"])
+    for info, data in (("agreed_info", "agreed_data"), ("agreed_participation", "agreed_data_use"),
+                       ("agree_info", "agree_data")):
+        if info in rec or data in rec:
+            return rec.get(info), rec.get(data)
+    return None, None
+
+def flatten(kind: str, rec: dict, schema: "pa.Schema") -> Dict[str, Any]:
+    """One stored record -> one row matching `schema` (unknown fields go to `extra` as JSON)."""
+    row: Dict[str, Any] = {"run_id": rec.get("run_id"), "timestamp": _to_ts(rec.get("timestamp")),
+                           "lang": rec.get("lang"), "content_hash": storage.content_hash(rec),
+                           "duplicate_of": rec.get("duplicate_of")}
+    used = {"run_id", "timestamp", "lang", "device_id", "duplicate_of"}
+    if kind == "consent":
+        row["agreed_info"], row["agreed_data"] = _consent_flags(rec)
+        used |= {"agreed", "agreed_info", "agreed_data", "agreed_participation",
+                 "agreed_data_use", "agree_info", "agree_data"}
+    elif kind == "survey":
+        big5 = rec.get("big5") or {}
+        for k in BIG5_KEYS:
+            row[f"big5_{k}"] = None if big5.get(k) is None else str(big5[k])
+            row[f"big5_{k}_num"] = records.likert_num(big5.get(k))
+        used.add("big5")
+    for field in schema.names:
+        if field in row or field in ("device_id", "source", "line", "extra") or field not in rec:
+            continue
+        typ, value = schema.field(field).type, rec[field]
+        if pa.types.is_integer(typ):
+            row[field] = _to_int(value)
+        elif pa.types.is_list(typ):
+            row[field] = [str(v) for v in value] if isinstance(value, list) else None
+        elif pa.types.is_boolean(typ):
+            row[field] = None if value is None else bool(value)
+        else:
+            row[field] = None if value is None else str(value)
+        used.add(field)
+    extra = {k: v for k, v in rec.items() if k not in used}
+    row["extra"] = json.dumps(extra, ensure_ascii=False) if extra else None
+    return row
+
+
+# -----------------
+#  COMPACTION
+# -----------------
+def _kind_dir(store_dir: str, kind: str) -> str:
+    return os.path.join(store_dir, kind)
+
+def _parts(store_dir: str, kind: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(_kind_dir(store_dir, kind), "part-*.parquet")))
+
+def _load_manifest(store_dir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(store_dir, MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def _save_manifest(store_dir: str, manifest: Dict[str, Any]):
+    tmp = os.path.join(store_dir, MANIFEST + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, os.path.join(store_dir, MANIFEST))
+
+def _write_part(store_dir: str, kind: str, table: "pa.Table"):
+    d = _kind_dir(store_dir, kind)
+    os.makedirs(d, exist_ok=True)
+    existing = _parts(store_dir, kind)
+    n = int(os.path.basename(existing[-1])[5:10]) + 1 if existing else 0
+    tmp = os.path.join(d, f".part-{n:05d}.parquet.tmp")
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, os.path.join(d, f"part-{n:05d}.parquet"))
+
+def _merge_parts(store_dir: str, kind: str):
+    parts = _parts(store_dir, kind)
+    if len(parts) <= 1:
+        return
+    table = pq.read_table(_kind_dir(store_dir, kind), schema=_schemas()[kind])
+    for p in parts:
+        os.remove(p)
+    _write_part(store_dir, kind, table.combine_chunks())
+
+def compact_kind(kind: str, data_dir: str, store_dir: str, manifest: Dict[str, Any],
+                 rebuild: bool = False) -> int:
+    """Ingest new records of one kind; returns the number of rows added."""
+    schema = _schemas()[kind]
+    seen = manifest.setdefault(kind, {})
+    sources = storage.source_files(kind, data_dir)
+
+    if not rebuild:
+        for path in sources:
+            st_ = os.stat(path)
+            prev = seen.get(os.path.relpath(path, data_dir))
+            if prev and (st_.st_size < prev["offset"]
+                         or (path.endswith(".json") and st_.st_mtime_ns != prev["mtime_ns"])):
+                rebuild = True   # rewritten, not appended
+                break
+        if set(seen) - {os.path.relpath(p, data_dir) for p in sources}:
+            rebuild = True       # a source disappeared
+    if rebuild:
+        for p in _parts(store_dir, kind):
+            os.remove(p)
+        seen.clear()
+
+    rows: List[Dict[str, Any]] = []
+    for path in sources:
+        rel = os.path.relpath(path, data_dir)
+        st_ = os.stat(path)
+        prev = seen.get(rel, {"offset": 0, "records": 0, "mtime_ns": None})
+        if prev["mtime_ns"] == st_.st_mtime_ns and prev["offset"] == st_.st_size:
+            continue
+        if path.endswith(".json") and prev["mtime_ns"] is not None:
+            continue
+        records, offset = storage.read_source(path, prev["offset"])
+        device = os.path.basename(os.path.dirname(path))
+        fmt = "json" if path.endswith(".json") else "jsonl"
+        for i, rec in enumerate(records, start=prev["records"]):
+            row = flatten(kind, rec, schema)
+            row.update(device_id=device, source=fmt, line=i)
+            rows.append(row)
+        seen[rel] = {"offset": offset, "records": prev["records"] + len(records), "mtime_ns": st_.st_mtime_ns}
+
+    if rows:
+        _write_part(store_dir, kind, pa.Table.from_pylist(rows, schema=schema))
+    if len(_parts(store_dir, kind)) > MAX_PARTS:
+        _merge_parts(store_dir, kind)
+    return len(rows)
+
+def compact(data_dir: str = storage.DATA_DIR, store_dir: str = STORE_DIR,
+            rebuild: bool = False) -> Dict[str, int]:
+    """Bring study/ up to date with data/; returns rows added per kind."""
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("study_store needs pyarrow: pip install pyarrow")
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = {} if rebuild else _load_manifest(store_dir)
+    if manifest.get("_schema", 1) != SCHEMA_VERSION:
+        manifest, rebuild = {}, True   # parts written with other columns
+    manifest["_schema"] = SCHEMA_VERSION
+    added = {kind: compact_kind(kind, data_dir, store_dir, manifest, rebuild) for kind in KINDS}
+    if rebuild:
+        for kind in KINDS:
+            _merge_parts(store_dir, kind)
+    _save_manifest(store_dir, manifest)
+    return added
+
+
+# -----------------
+#  LOADING
+# -----------------
+def _pandas_types(typ: "pa.DataType"):
+    """Nullable pandas dtypes, so an int column with gaps stays an int column."""
+    return {pa.int8(): pd.Int8Dtype(), pa.int16(): pd.Int16Dtype(),
+            pa.int32(): pd.Int32Dtype(), pa.bool_(): pd.BooleanDtype()}.get(typ)
+
+def load_table(kind: str, store_dir: str = STORE_DIR, columns: Optional[List[str]] = None) -> "pa.Table":
+    schema = _schemas()[kind]
+    if not _parts(store_dir, kind):
+        return schema.empty_table() if columns is None else schema.empty_table().select(columns)
+    return pq.read_table(_kind_dir(store_dir, kind), schema=schema, columns=columns)
+
+def load(kind: str, store_dir: str = STORE_DIR, columns: Optional[List[str]] = None,
+         dedup: str = "all") -> pd.DataFrame:
+    """
+    The whole study for one kind as a DataFrame (a few file opens, no JSON parsing).
+    dedup="first" / "latest": one row per device and distinct answer set.
+    """
+    if dedup not in storage.DEDUP_MODES:
+        raise ValueError(f"dedup must be one of {storage.DEDUP_MODES}, got {dedup!r}")
+    if dedup == "all":
+        return load_table(kind, store_dir, columns).to_pandas(types_mapper=_pandas_types)
+    keys = ["device_id", "content_hash"]
+    wanted = None if columns is None else list(dict.fromkeys(columns + keys))
+    df = load_table(kind, store_dir, wanted).to_pandas(types_mapper=_pandas_types)
+    df = df.drop_duplicates(keys, keep="first" if dedup == "first" else "last")
+    return df if columns is None else df[columns]
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Compact data/ into the columnar study store.")
+    ap.add_argument("--data", default=storage.DATA_DIR)
+    ap.add_argument("--out", default=STORE_DIR)
+    ap.add_argument("--rebuild", action="store_true", help="rewrite everything from scratch")
+    ap.add_argument("--watch", type=float, metavar="SECONDS", help="keep ingesting at this interval")
+    args = ap.parse_args()
+    try:
+        while True:
+            t0 = time.perf_counter()
+            added = compact(args.data, args.out, rebuild=args.rebuild)
+            print(f"{time.strftime('%H:%M:%S')} +rows {added} in {time.perf_counter() - t0:.2f}s", flush=True)
+            if not args.watch:
+                break
+            args.rebuild = False
+            time.sleep(args.watch)
+    except KeyboardInterrupt:
+        sys.exit(0)
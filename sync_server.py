@@ -0,0 +1,232 @@
+# sync_server.py
+"""
+Offline-first client for phones on a shaky booth Wi-Fi, and the endpoint it syncs to.
+
+The Streamlit app keeps a participant's answers in the server-side session, so a
+Wi-Fi drop mid-survey loses them. The offline client (static/offline/) is a small
+PWA instead: a service worker caches the page and the questionnaire of every
+language, answers are kept in IndexedDB while they are given, and finished records
+(consent, survey) go into an IndexedDB outbox that is sent in batches whenever the
+laptop is reachable. The server sees one request per batch instead of one per widget.
+
+    python sync_server.py                       # http://<laptop>:8502/offline/
+    python sync_server.py --port 8502 --address 0.0.0.0
+
+Behind deploy/nginx.conf or deploy/Caddyfile it is reachable as /offline/ on the
+app's port 8501.
+
+Endpoints (all under /offline/):
+    GET  /offline/, /offline/<file>      the client (static/offline/)
+    GET  /offline/api/form?lang=de       questionnaire + strings of one language (i18n.py)
+    POST /offline/api/sync               {"records": [{"kind", "device_id", "record"}, …]}
+                                         -> {"results": ["stored" | "duplicate" | "rejected", …]}
+
+Records are written with the store's append_many (same files / database as the
+app's STORE.append). They carry the run_id the phone gave them, so a batch that is
+sent again after a lost response is stored only once.
+"""
+
+import os
+import sys
+import json
+import argparse
+import functools
+import mimetypes
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, List, Dict, Any, Tuple
+
+import aggregates
+import i18n
+import ids
+import questionnaire
+import storage
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CLIENT_DIR = os.path.join(ROOT, "static", "offline")
+PREFIX = "/offline"
+PORT = int(os.environ.get("MENTALYTICS_SYNC_PORT", "8502"))
+
+KINDS = ("consent", "survey", "agreement")   # what a phone may send
+MAX_BODY = 1 << 20                           # bytes per sync request
+MAX_BATCH = 200                              # records per sync request
+
+mimetypes.add_type("application/manifest+json", ".webmanifest")
+mimetypes.add_type("text/javascript", ".js")
+
+
+# -----------------
+#  QUESTIONNAIRE
+# -----------------
+# Questions, options and stored field names come from questionnaire.py, like the
+# survey sections of app.py.
+UI_KEYS = ("app_title", "welcome_intro", "consent_title", "consent_intro", "consent_info_header",
+           "consent_md", "consent_check1", "consent_check2", "continue", "study_title",
+           "save_and_continue", "required_answers", "missing_fields", "multi_hint", "specify",
+           "device", "footer_text", "offline_queued", "offline_synced", "offline_pending",
+           "offline_results")
+
+YOUTUBE_ID = "UK3eW6ZQuuc"   # same clip as app.render_exercise_video
+# Where "Show my results" points: the Streamlit app. "../" when both sit behind the proxy.
+APP_URL = os.environ.get("MENTALYTICS_APP_URL", "../")
+
+
+@functools.lru_cache(maxsize=None)
+def form(lang: str) -> bytes:
+    """The questionnaire of one language as the client renders it (JSON, built once)."""
+    cat = i18n.catalog(lang)
+    yes = questionnaire.options(lang, "yes_no")[0]
+    sections = []
+    for title_key, fields in questionnaire.SECTIONS:
+        questions = []
+        for field, label_key, spec, widget in fields:
+            opts = questionnaire.options(lang, spec)
+            q = {"field": field, "label": cat[label_key], "widget": widget, "options": opts}
+            if widget == "multi":
+                q["label"] += f" {cat['multi_hint']}"
+            others = [o for o in opts if questionnaire.is_other(o)]
+            if field in questionnaire.SPECIFY and others:
+                q["other"] = others
+            if field in questionnaire.SURGERY_FOLLOWUPS:
+                q["if"] = {"field": "surgery", "equals": yes}
+            questions.append(q)
+        sections.append({"title": cat[f"survey.{title_key}"], "questions": questions})
+    likert = cat["likert7"]
+    sections.insert(-1, {"title": cat["survey.sec_big5"], "questions": [
+        {"field": f"big5.{k}", "label": cat["survey.big5"][k], "widget": "choice",
+         "options": likert, "default": likert[i]}
+        for k, i in questionnaire.BIG5_DEFAULTS.items()
+    ]})
+    return json.dumps({
+        "lang": lang,
+        "languages": [{"code": l, "name": i18n.lang_name(l, l), "flag": i18n.lang_flag(l)}
+                      for l in i18n.LANGUAGES],
+        "strings": {k: cat.get(k, k) for k in UI_KEYS},
+        "sections": sections,
+        "video": f"https://www.youtube-nocookie.com/embed/{YOUTUBE_ID}",
+        "app_url": APP_URL,
+    }, ensure_ascii=False).encode("utf-8")
+
+
+# -----------------
+#  SYNC
+# -----------------
+def _check(item: Any) -> Optional[Tuple[str, str, dict]]:
+    """
+    (kind, device_id, record) of a well-formed batch item, else None: a ULID run_id
+    (so the store keeps run_id order) and the fields and options of
+    questionnaire.problems(), as the app's widgets would have allowed.
+    """
+    if not isinstance(item, dict):
+        return None
+    kind, device, rec = item.get("kind"), item.get("device_id"), item.get("record")
+    if kind not in KINDS or not isinstance(device, str) or not ids.valid_device(device):
+        return None
+    if not isinstance(rec, dict) or not isinstance(rec.get("run_id"), str) or not ids.is_ulid(rec["run_id"]):
+        return None
+    if kind != "consent":   # the app stores device_id inside survey / agreement records
+        rec = {**rec, "device_id": device}
+    if questionnaire.problems(kind, rec):
+        return None
+    return kind, device, rec
+
+def sync(items: List[Any], store=None) -> List[str]:
+    """Store a batch from a phone; one result per item, in order."""
+    store = store or storage.get_store()
+    results = ["rejected"] * len(items)
+    groups: Dict[Tuple[str, str], List[Tuple[int, dict]]] = {}
+    for i, item in enumerate(items):
+        checked = _check(item)
+        if checked:
+            kind, device, rec = checked
+            groups.setdefault((kind, device), []).append((i, rec))
+    for (kind, device), recs in groups.items():
+        recs.sort(key=lambda ir: ids.sort_key(ir[1]["run_id"]))   # oldest first, as the app appends
+        save = functools.partial(store.append_many, device, kind, [r for _, r in recs])
+        new = aggregates.store_surveys(store, device, save) if kind == "survey" else save()
+        stored = {r["run_id"] for r in new}
+        for i, rec in recs:
+            results[i] = "stored" if rec["run_id"] in stored else "duplicate"
+            stored.discard(rec["run_id"])   # a run_id twice in one batch: the 2nd is a duplicate
+    return results
+
+
+# -----------------
+#  HTTP
+# -----------------
+class Handler(BaseHTTPRequestHandler):
+    server_version = "mentalytics-sync"
+
+    def _send(self, status: int, body: bytes, ctype: str = "application/json", cache: str = "no-cache"):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", cache)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _json(self, status: int, obj: Any):
+        self._send(status, json.dumps(obj).encode("utf-8"))
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        path = url.path
+        if path == PREFIX:
+            self.send_response(301)
+            self.send_header("Location", PREFIX + "/" + (f"?{url.query}" if url.query else ""))
+            self.end_headers()
+            return
+        if not path.startswith(PREFIX + "/"):
+            return self._json(404, {"error": "not found"})
+        rel = path[len(PREFIX) + 1:]
+        if rel == "api/form":
+            lang = urllib.parse.parse_qs(url.query).get("lang", [i18n.FALLBACK_LANG])[0]
+            return self._send(200, form(lang if lang in i18n.LANGUAGES else i18n.FALLBACK_LANG))
+        name = rel or "index.html"
+        file = os.path.join(CLIENT_DIR, name)
+        if "/" in name or name.startswith(".") or not os.path.isfile(file):
+            return self._json(404, {"error": "not found"})
+        with open(file, "rb") as f:
+            body = f.read()
+        # no-cache: what the phone keeps offline is up to the service worker (sw.js)
+        self._send(200, body, mimetypes.guess_type(name)[0] or "application/octet-stream")
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        if urllib.parse.urlsplit(self.path).path != PREFIX + "/api/sync":
+            return self._json(404, {"error": "not found"})
+        length = int(self.headers.get("Content-Length") or 0)
+        if not 0 < length <= MAX_BODY:
+            return self._json(413, {"error": f"body must be 1..{MAX_BODY} bytes"})
+        try:
+            items = json.loads(self.rfile.read(length).decode("utf-8"))["records"]
+        except Exception:
+            return self._json(400, {"error": "expected {\"records\": [...]}"})
+        if not isinstance(items, list) or len(items) > MAX_BATCH:
+            return self._json(400, {"error": f"records must be a list of at most {MAX_BATCH}"})
+        self._json(200, {"results": sync(items)})
+
+    def log_message(self, fmt: str, *args):
+        if self.command == "POST" or os.environ.get("MENTALYTICS_SYNC_LOG"):
+            sys.stderr.write(f"{self.address_string()} {fmt % args}\n")
+
+
+def serve(port: int = PORT, address: str = "0.0.0.0") -> ThreadingHTTPServer:
+    os.chdir(ROOT)   # data/ (or the SQLite file) relative to the app, as for streamlit run
+    return ThreadingHTTPServer((address, port), Handler)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Offline client + batch sync endpoint for phones.")
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--address", default="0.0.0.0")
+    args = ap.parse_args()
+    httpd = serve(args.port, args.address)
+    print(f"offline client on http://{args.address}:{args.port}{PREFIX}/ (store: {storage.STORE_BACKEND})", flush=True)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    sys.exit(0)